@@ -0,0 +1,169 @@
+# Binary checkpoints for networks and evolutionary populations.
+#
+# File layout: magic (8 bytes) | format version (uint32) | header size (uint32) | JSON header | raw arrays
+# Every raw array starts on an ALIGNMENT boundary and the header records its offset, shape and dtype,
+# so parameter buffers can be memory-mapped straight from the file instead of being read into memory.
+import contextlib
+import json
+import os
+import struct
+import threading
+from typing import Callable
+import numpy as np
+import ann.functions as f
+from ann.ens import EvolutionaryNetworkSystem
+from ann.neural import CLIP_VALUE, Network
+from ann.optimizers import OPTIMIZERS, SCHEDULES
+
+MAGIC = b"NNCKPT\0\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct("<8sII")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _plain_attributes(obj) -> dict:
+    return {key: value for key, value in vars(obj).items() if isinstance(value, (int, float, str))}
+
+
+class _ArrayWriter:
+    def __init__(self):
+        self.arrays = []
+        self.descriptions = []
+        self.offset = 0
+
+    def add(self, array: np.ndarray) -> int:
+        array = np.ascontiguousarray(array)
+        self.descriptions.append({"offset": self.offset, "shape": list(array.shape), "dtype": array.dtype.str})
+        self.arrays.append(array)
+        self.offset = _align(self.offset + array.nbytes)
+        return len(self.arrays) - 1
+
+
+def _describe_network(network: Network, writer: _ArrayWriter) -> dict:
+    optimizer = network.optimizer
+    return {
+        "layers": network.layers,
+        "functions": [function.name for function in network.functions],
+        "loss": network.loss_function.name,
+        "learning_rate": network.learning_rate,
+        "clip_value": network.clip_value,
+        "dtype": network.dtype.str,
+        "version": network.version,
+        "parameters": writer.add(network.parameters),
+        "optimizer": {
+            "name": optimizer.name,
+            "attributes": _plain_attributes(optimizer),
+            "schedule": {"name": optimizer.schedule.name, "attributes": _plain_attributes(optimizer.schedule)},
+            "state": {name: writer.add(state) for name, state in optimizer.state.items()}
+        }
+    }
+
+
+def _write(path: str, header: dict, writer: _ArrayWriter) -> None:
+    header["arrays"] = writer.descriptions
+    encoded = json.dumps(header).encode("utf-8")
+    data_start = _align(PREAMBLE.size + len(encoded))
+    # written next to the target and renamed over it, so a crash never leaves a half-written checkpoint and networks
+    # that still map the old file keep their parameters
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            file.write(encoded)
+            for description, array in zip(writer.descriptions, writer.arrays):
+                file.seek(data_start + description["offset"])
+                file.write(array.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        # the temporary file does not exist when opening it was what failed
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temporary)
+        raise
+
+
+def _read_header(path: str) -> tuple[dict, int]:
+    with open(path, "rb") as file:
+        magic, version, header_size = PREAMBLE.unpack(file.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a network checkpoint")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path} uses checkpoint format {version}, newest supported is {FORMAT_VERSION}")
+        header = json.loads(file.read(header_size).decode("utf-8"))
+    return header, _align(PREAMBLE.size + header_size)
+
+
+def _read_array(path: str, description: dict, data_start: int, mmap: bool) -> np.ndarray:
+    shape = tuple(description["shape"])
+    if mmap:
+        # copy-on-write, so that training a loaded network never writes back into the checkpoint
+        return np.memmap(path, dtype=description["dtype"], mode="c", offset=data_start + description["offset"],
+                         shape=shape)
+    with open(path, "rb") as file:
+        file.seek(data_start + description["offset"])
+        return np.fromfile(file, dtype=description["dtype"], count=int(np.prod(shape))).reshape(shape)
+
+
+def _build_network(description: dict, arrays: Callable[[int], np.ndarray]) -> Network:
+    optimizer_description = description["optimizer"]
+    schedule = SCHEDULES[optimizer_description["schedule"]["name"]]()
+    vars(schedule).update(optimizer_description["schedule"]["attributes"])
+    optimizer = OPTIMIZERS[optimizer_description["name"]](schedule)
+    vars(optimizer).update(optimizer_description["attributes"])
+    if optimizer_description["state"]:
+        optimizer.state = {name: np.array(arrays(idx)) for name, idx in optimizer_description["state"].items()}
+        optimizer.scratch = np.empty_like(next(iter(optimizer.state.values())))
+
+    network = Network(description["layers"], description["learning_rate"], description["functions"],
+                      f.get_loss(description["loss"]), np.dtype(description["dtype"]), optimizer,
+                      arrays(description["parameters"]))
+    network.version = description["version"]
+    network.clip_value = description.get("clip_value", CLIP_VALUE)
+    return network
+
+
+def _load(path: str, kind: str, mmap: bool) -> tuple[dict, list[Network]]:
+    header, data_start = _read_header(path)
+    if header["kind"] != kind:
+        raise ValueError(f"{path} holds a {header['kind']} checkpoint, not a {kind}")
+
+    def arrays(idx):
+        return _read_array(path, header["arrays"][idx], data_start, mmap)
+
+    return header, [_build_network(description, arrays) for description in header["networks"]]
+
+
+def save_network(path: str, network: Network) -> None:
+    writer = _ArrayWriter()
+    _write(path, {"kind": "network", "networks": [_describe_network(network, writer)]}, writer)
+
+
+def load_network(path: str, mmap: bool = False) -> Network:
+    return _load(path, "network", mmap)[1][0]
+
+
+def save_population(path: str, system: EvolutionaryNetworkSystem) -> None:
+    writer = _ArrayWriter()
+    # tournament selection can put the same network into the population several times, store it once
+    unique = {}
+    for network in system.population:
+        unique.setdefault(id(network), (len(unique), network))
+    header = {
+        "kind": "population",
+        "pmut": system.pmut,
+        "pcros": system.pcros,
+        "networks": [_describe_network(network, writer) for _, network in unique.values()],
+        "population": [unique[id(network)][0] for network in system.population]
+    }
+    _write(path, header, writer)
+
+
+def load_population(path: str, mmap: bool = False) -> EvolutionaryNetworkSystem:
+    header, networks = _load(path, "population", mmap)
+    return EvolutionaryNetworkSystem.from_population([networks[idx] for idx in header["population"]],
+                                                     header["pmut"], header["pcros"])
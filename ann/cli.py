@@ -0,0 +1,204 @@
+import argparse
+import json
+import logging
+import os
+import random as rand
+import sys
+import time
+import numpy as np
+import ann.functions as f
+from ann.checkpoint import load_network, load_population, save_network, save_population
+from ann.data import Dataset
+from ann.ens import EvolutionaryNetworkSystem
+from ann.neural import Network
+from ann.optimizers import OPTIMIZERS, SCHEDULES, get_optimizer
+from ann.parallel import ParallelTrainer
+from ann.sweep import SPACES, grid_configs, random_configs, run_sweep
+from ann.training import TrainingController
+
+logger = logging.getLogger("ann")
+
+
+def load_dataset(path: str, labels_path: str = None, dtype=np.float64) -> Dataset:
+    # .npy files stay memory-mapped in their stored dtype, the network casts every batch it reads
+    if path.endswith(".npy"):
+        if labels_path is not None:
+            return Dataset.from_npy(path, labels_path)
+        table = np.load(path, mmap_mode="r")
+        return Dataset(table[:, :-1], table[:, -1])
+    with open(path) as file:
+        first_line = file.readline()
+    try:
+        [float(value) for value in first_line.split(",")]
+        header_rows = 0
+    except ValueError:
+        header_rows = 1
+    table = np.loadtxt(path, delimiter=",", skiprows=header_rows, dtype=dtype, ndmin=2)
+    return Dataset(table[:, :-1], table[:, -1])
+
+
+def parse_architecture(args, dataset: Dataset) -> tuple[list[int], list[str]]:
+    hidden = [int(size) for size in args.hidden.split(",") if size]
+    layers = [dataset.features.shape[1]] + hidden + [dataset.labels.shape[1]]
+    if args.functions:
+        functions = args.functions.split(",")
+    else:
+        functions = ["tanh"] * len(hidden) + ["sig"]
+    if len(functions) != len(layers) - 1:
+        raise SystemExit(f"Expected {len(layers) - 1} activation functions, got {len(functions)}")
+    for name in functions:
+        f.get_activation(name)
+    return layers, functions
+
+
+def train(args, dataset: Dataset) -> None:
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        network = load_network(args.checkpoint)
+        logger.info("Resumed network from %s", args.checkpoint)
+    else:
+        layers, functions = parse_architecture(args, dataset)
+        network = Network(layers, args.learning_rate, functions, f.get_loss(args.loss), args.dtype,
+                          get_optimizer(args.optimizer, args.schedule))
+    controller = TrainingController(network, patience=args.patience, target_accuracy=args.target_accuracy,
+                                    chunk_size=args.eval_batch_size)
+    trainer = ParallelTrainer(network, dataset, args.processes) if args.processes and args.processes > 1 else None
+    start = time.perf_counter()
+    try:
+        for epoch in range(1, args.epochs + 1):
+            stop = controller.update(dataset.features, dataset.labels)
+            if epoch % args.log_every == 0 or stop:
+                logger.info("epoch %d: best accuracy %.4f, best loss %.6f (epoch %d), %.1fs",
+                            epoch, controller.best_accuracy, controller.best_loss, controller.best_epoch,
+                            time.perf_counter() - start)
+            if stop:
+                break
+            if trainer is not None:
+                trainer.train_epoch(args.batch_size)
+            else:
+                for inputs, labels in dataset.batches(args.batch_size):
+                    network.backpropagation_batch(inputs, labels)
+            if args.checkpoint and epoch % args.checkpoint_every == 0:
+                save_network(args.checkpoint, network)
+    finally:
+        if trainer is not None:
+            trainer.close()
+    controller.restore_best()
+    if args.checkpoint:
+        save_network(args.checkpoint, network)
+        logger.info("Saved best network to %s", args.checkpoint)
+
+
+def evolve(args, dataset: Dataset) -> None:
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        system = load_population(args.checkpoint)
+        logger.info("Resumed population from %s", args.checkpoint)
+    else:
+        layers, functions = parse_architecture(args, dataset)
+        system = EvolutionaryNetworkSystem(args.pop_size, args.pmut, args.pcros, layers, args.learning_rate,
+                                           functions, f.get_loss(args.loss), args.dtype)
+    start = time.perf_counter()
+
+    def report(generation, system):
+        if generation % args.log_every == 0:
+            logger.info("generation %d: best error %.6f, average error %.6f, %.1fs", generation,
+                        system.get_best_error(dataset), system.get_average_error(dataset), time.perf_counter() - start)
+        if args.checkpoint and generation % args.checkpoint_every == 0:
+            save_population(args.checkpoint, system)
+
+    if args.islands > 1:
+        per_migration = min(args.generations_per_migration, args.generations)
+        if args.generations % per_migration != 0:
+            raise SystemExit(f"--generations ({args.generations}) must be a multiple of "
+                             f"--generations-per-migration ({per_migration})")
+        system.evolve_islands(dataset, args.islands, per_migration, args.generations // per_migration, args.migrants,
+                              seed=args.seed, processes=args.processes, callback=report)
+    else:
+        system.evolve(dataset, args.generations, callback=report)
+    logger.info("Finished with best error %.6f", system.get_best_error(dataset))
+    if args.checkpoint:
+        save_population(args.checkpoint, system)
+        logger.info("Saved population to %s", args.checkpoint)
+
+
+def sweep(args, dataset: Dataset) -> None:
+    configs = []
+    for method in args.methods.split(","):
+        if method not in SPACES:
+            raise SystemExit(f"Unknown sweep method {method}, expected one of {', '.join(SPACES)}")
+        if args.search == "grid":
+            configs += grid_configs(method)
+        else:
+            configs += random_configs(method, args.trials)
+    results = run_sweep(dataset, configs, args.rounds, args.steps_per_round, args.batch_size, args.warmup_rounds,
+                        args.cache_directory, args.processes, args.dtype)
+    for rank, result in enumerate(results[:args.top], 1):
+        logger.info("#%d loss %.6f, accuracy %.4f, %.1fs %s", rank, result["loss"], result["accuracy"],
+                    result["seconds"], json.dumps(result["config"]))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ann", description="Train or evolve networks without the GUI.")
+    parser.add_argument("mode", choices=["train", "evolve", "sweep"])
+    parser.add_argument("data", help="CSV or .npy table whose last column holds the labels, or a .npy feature file")
+    parser.add_argument("--labels", help=".npy label file that goes with a .npy feature file")
+    parser.add_argument("--hidden", default="8,8", help="comma separated hidden layer sizes")
+    parser.add_argument("--functions", help="comma separated activation names, one per non-input layer")
+    parser.add_argument("--loss", default=f.MSE.name, choices=list(f.LOSSES))
+    parser.add_argument("--learning-rate", type=float, default=0.045)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", help="checkpoint file written during and after the run")
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint if it exists")
+    parser.add_argument("--log-every", type=int, default=10)
+    parser.add_argument("--log-file", help="log to this file instead of stdout")
+    parser.add_argument("--processes", type=int,
+                        help="worker processes for data-parallel training or the island model")
+
+    training = parser.add_argument_group("train")
+    training.add_argument("--optimizer", default="SGD", choices=list(OPTIMIZERS))
+    training.add_argument("--schedule", default="Constant", choices=list(SCHEDULES))
+    training.add_argument("--epochs", type=int, default=5000)
+    training.add_argument("--batch-size", type=int, default=4)
+    training.add_argument("--patience", type=int, default=250)
+    training.add_argument("--target-accuracy", type=float, default=1.0)
+    training.add_argument("--eval-batch-size", type=int, default=65536,
+                          help="rows per forward pass when the controller scores the whole dataset")
+
+    evolution = parser.add_argument_group("evolve")
+    evolution.add_argument("--pop-size", type=int, default=20)
+    evolution.add_argument("--pmut", type=float, default=0.6)
+    evolution.add_argument("--pcros", type=float, default=0.5)
+    evolution.add_argument("--generations", type=int, default=20)
+    evolution.add_argument("--islands", type=int, default=1)
+    evolution.add_argument("--generations-per-migration", type=int, default=5)
+    evolution.add_argument("--migrants", type=int, default=1)
+
+    sweeping = parser.add_argument_group("sweep")
+    sweeping.add_argument("--methods", default="train", help="comma separated: train, evolve")
+    sweeping.add_argument("--search", default="random", choices=["grid", "random"])
+    sweeping.add_argument("--trials", type=int, default=32, help="trials per method for random search")
+    sweeping.add_argument("--rounds", type=int, default=5)
+    sweeping.add_argument("--steps-per-round", type=int, default=20, help="epochs or generations per round")
+    sweeping.add_argument("--warmup-rounds", type=int, default=1, help="rounds before the median pruning starts")
+    sweeping.add_argument("--cache-directory", default=".sweep_cache")
+    sweeping.add_argument("--top", type=int, default=5, help="number of best trials to log")
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.log_file:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", filename=args.log_file)
+    else:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", stream=sys.stdout)
+    rand.seed(args.seed)
+    np.random.seed(args.seed)
+    dataset = load_dataset(args.data, args.labels, args.dtype)
+    logger.info("Loaded %d points with %d features from %s", len(dataset), dataset.features.shape[1], args.data)
+    if args.mode == "train":
+        train(args, dataset)
+    elif args.mode == "evolve":
+        evolve(args, dataset)
+    else:
+        sweep(args, dataset)
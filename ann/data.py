@@ -0,0 +1,43 @@
+from typing import Iterator
+import numpy as np
+from ann.neural import labeled_entry, to_arrays
+
+
+class Dataset:
+    def __init__(self, features: np.ndarray, labels: np.ndarray):
+        if len(features) != len(labels):
+            raise ValueError(f"Got {len(features)} feature rows but {len(labels)} labels")
+        self.features = features
+        self.labels = labels.reshape(len(labels), -1)
+
+    @classmethod
+    def from_entries(cls, data: list[labeled_entry], dtype=np.float64) -> "Dataset":
+        return cls(*to_arrays(data, dtype))
+
+    @classmethod
+    def from_npy(cls, features_path: str, labels_path: str, mmap: bool = True) -> "Dataset":
+        mmap_mode = "r" if mmap else None
+        return cls(np.load(features_path, mmap_mode=mmap_mode), np.load(labels_path, mmap_mode=mmap_mode))
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def batch_indices(self, batch_size: int, shuffle: bool = True, rng=np.random) -> Iterator:
+        if not shuffle:
+            for start in range(0, len(self), batch_size):
+                yield slice(start, start + batch_size)
+            return
+        order = rng.permutation(len(self))
+        for start in range(0, len(self), batch_size):
+            # sorted gathers keep reads sequential when the arrays are memory-mapped
+            yield np.sort(order[start:start + batch_size])
+
+    def batches(self, batch_size: int, shuffle: bool = True, rng=np.random) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for indices in self.batch_indices(batch_size, shuffle, rng):
+            yield self.features[indices], self.labels[indices]
+
+
+def as_arrays(data, dtype=np.float64) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(data, Dataset):
+        return np.asarray(data.features, dtype=dtype), np.asarray(data.labels, dtype=dtype)
+    return to_arrays(data, dtype)
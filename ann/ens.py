@@ -1,114 +1,247 @@
 import random as rand
+import weakref
 import numpy as np
-from ann.neural import Network, to_batches
+import ann.functions as f
+from ann.data import Dataset, as_arrays
+from ann.neural import Network
+from ann.profiling import phase
+
+
+def population_key(network: Network) -> tuple:
+    return tuple(weight.shape for weight in network.weights), network.functions, network.loss_function
+
+
+def stack_parameters(networks: list[Network]) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    return networks[0].parameter_views(np.stack([network.parameters for network in networks]))
+
+
+def population_fitness(networks: list[Network], inputs: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    groups = {}
+    for idx, network in enumerate(networks):
+        groups.setdefault(population_key(network), []).append(idx)
+
+    fitness = np.empty(len(networks), dtype=inputs.dtype)
+    for (_, functions, loss_function), indices in groups.items():
+        weights, biases = stack_parameters([networks[idx] for idx in indices])
+        current_output = inputs
+        for weight, bias, function in zip(weights, biases, functions):
+            current_output = function(current_output @ weight.transpose(0, 2, 1) + bias[:, np.newaxis, :])
+        errors = np.sum(loss_function(current_output, labels), axis=-1)
+        fitness[indices] = np.sum(np.abs(errors), axis=-1)
+    return fitness
+
+
+def _evolve_island(population, pmut, pcros, data, generations, mutation_factor, seed):
+    rand.seed(seed)
+    np.random.seed(seed)
+    island = EvolutionaryNetworkSystem.from_population(population, pmut, pcros)
+    island.evolve(data, generations, mutation_factor)
+    return island.population, island.get_population_fitness(data)
 
 
 class EvolutionaryNetworkSystem:
-    def __init__(self, pop_size, pmut, pcros, layers, learning_rate, functions=None):
-        self.population = [Network(layers, learning_rate, functions) for _ in range(pop_size)]
+    def __init__(self, pop_size, pmut, pcros, layers, learning_rate, functions=None, loss_function=f.MSE,
+                 dtype=np.float64):
+        self.population = [Network(layers, learning_rate, functions, loss_function, dtype) for _ in range(pop_size)]
+        self.dtype = np.dtype(dtype)
         self.pmut = pmut
         self.pcros = pcros
+        # weak keys, so networks dropped from the population (or replaced after a migration) are freed
+        self.fitness_cache = weakref.WeakKeyDictionary()
+        self.cache_data_key = None
+        self.fitness_data = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.profiler = None
+
+    @classmethod
+    def from_population(cls, population, pmut, pcros):
+        system = cls(0, pmut, pcros, None, None, dtype=population[0].dtype)
+        system.population = list(population)
+        return system
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["fitness_cache"] = None
+        state["cache_data_key"] = None
+        state["fitness_data"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.fitness_cache = weakref.WeakKeyDictionary()
+        self.fitness_data = None
+
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+        for network in self.population:
+            network.profiler = profiler
 
     @staticmethod
     def mutate(Net, mutation_factor):
-        for bias in Net.biases:
-            for element in bias:
-                element += np.random.normal(0)*mutation_factor
-        for weight in Net.weights:
-            for element in weight:
-                element += np.random.normal(0)*mutation_factor
+        Net.parameters += (np.random.normal(0, 1, Net.parameters.shape) * mutation_factor).astype(Net.dtype)
+        Net.version += 1
 
     @staticmethod
     def crossover(Net1, Net2):
-        NewNet1 = Net1
-        NewNet2 = Net2
-        for i in range(len(Net1.biases)):
-            if i % 2 == 0:
-                NewNet1.biases[i] = Net1.biases[i]
-                NewNet2.biases[i] = Net2.biases[i]
-            else:
-                NewNet1.biases[i] = Net2.biases[i]
-                NewNet2.biases[i] = Net1.biases[i]
-
-        for i in range(len(Net1.weights)):
-            if i % 2 == 0:
-                NewNet1.weights[i] = Net1.weights[i]
-                NewNet2.weights[i] = Net2.weights[i]
-            else:
-                NewNet1.weights[i] = Net2.weights[i]
-                NewNet2.weights[i] = Net1.weights[i]
-
-        return NewNet1, NewNet2
+        if Net1 is Net2:
+            return Net1, Net2
+        for layer in Net1.layer_slices[1::2]:
+            Net1.parameters[layer], Net2.parameters[layer] = Net2.parameters[layer].copy(), Net1.parameters[layer].copy()
+        Net1.version += 1
+        Net2.version += 1
+        return Net1, Net2
 
     @staticmethod
     def get_fitness(network, data):
-        return sum([abs(network.get_error(network.calculate_all(point)[-1], cls)[0][0]) for point, cls in data])
+        return population_fitness([network], *as_arrays(data, network.dtype))[0]
+
+    def get_population_fitness(self, data):
+        return self.get_cached_fitness(self.population, data)
+
+    def fitness_arrays(self, data):
+        # inside evolve the data is converted and fingerprinted once, see bind_fitness_data
+        if self.fitness_data is not None and data is self.fitness_data[0]:
+            return self.fitness_data[1], self.fitness_data[2]
+        inputs, labels = as_arrays(data, self.dtype)
+        data_key = (inputs.shape, labels.shape, hash(inputs.tobytes()), hash(labels.tobytes()))
+        if data_key != self.cache_data_key:
+            self.clear_fitness_cache()
+            self.cache_data_key = data_key
+        return inputs, labels
+
+    def bind_fitness_data(self, data):
+        self.fitness_data = None
+        if data is not None:
+            self.fitness_data = (data,) + self.fitness_arrays(data)
+
+    def get_cached_fitness(self, networks, data):
+        inputs, labels = self.fitness_arrays(data)
+        missing = {}
+        for network in networks:
+            cached = self.fitness_cache.get(network)
+            if cached is None or cached[0] != network.version:
+                missing[id(network)] = network
+        if missing:
+            values = population_fitness(list(missing.values()), inputs, labels)
+            for network, value in zip(missing.values(), values):
+                self.fitness_cache[network] = (network.version, value)
+        self.cache_misses += len(missing)
+        self.cache_hits += len(networks) - len(missing)
+        if self.profiler is not None:
+            self.profiler.count("fitness/evaluations", len(missing))
+            self.profiler.count("fitness/cache hits", len(networks) - len(missing))
+        return np.array([self.fitness_cache[network][1] for network in networks])
+
+    def clear_fitness_cache(self):
+        self.fitness_cache.clear()
+        self.cache_data_key = None
 
     def tournament(self, data, size=4):
+        fitness = self.get_population_fitness(data)
         newpopulation = []
         while len(newpopulation) < len(self.population):
-            sample = rand.sample(self.population, size)
+            sample = rand.sample(range(len(self.population)), size)
             best = sample[0]
-            best_error = self.get_fitness(best, data)
-            for network in sample[1:]:
-                current_error = self.get_fitness(network, data)
-                if current_error < best_error:
-                    best = network
-                    best_error = current_error
-            newpopulation.append(best)
+            for idx in sample[1:]:
+                if fitness[idx] < fitness[best]:
+                    best = idx
+            newpopulation.append(self.population[best])
         return newpopulation
 
-    def evolve(self, data, maxgen=5, mutation_factor=1/400):
+    def evolve(self, data, maxgen=5, mutation_factor=1/400, callback=None):
+        if not isinstance(data, Dataset):
+            data = Dataset.from_entries(data, self.dtype)
+        self.bind_fitness_data(data)
+        try:
+            return self.run_generations(data, maxgen, mutation_factor, callback)
+        finally:
+            self.bind_fitness_data(None)
+
+    def run_generations(self, data, maxgen, mutation_factor, callback):
         generation = 0
         best = self.get_best_network(data)
 
         while generation < maxgen:
             generation += 1
 
-            for network in self.population:
-                for i in range(1):
-                    for batch in to_batches(data, 4):
-                        network.backpropagation(batch)
-
-            for network in self.population:
-                if np.random.random() < self.pmut:
-                    self.mutate(network, mutation_factor)
-
-            for network in self.population:
-                if np.random.random() < self.pcros:
-                    self.crossover(network, rand.choice(self.population))
-
-            for network in self.population:
-                if np.random.random() < self.pcros:
-                    self.crossover(network, rand.choice(self.population))
-
-            self.population = self.tournament(data)
-            current_best = self.get_best_network(data)
-            if self.get_fitness(current_best, data) < self.get_fitness(best, data):
-                best = current_best
+            with phase(self.profiler, "evolve/backpropagation"):
+                for network in self.population:
+                    for inputs, labels in data.batches(4, shuffle=False):
+                        network.backpropagation_batch(inputs, labels)
+
+            with phase(self.profiler, "evolve/mutation"):
+                for network in self.population:
+                    if np.random.random() < self.pmut:
+                        self.mutate(network, mutation_factor)
+
+            with phase(self.profiler, "evolve/crossover"):
+                for network in self.population:
+                    if np.random.random() < self.pcros:
+                        self.crossover(network, rand.choice(self.population))
+
+                for network in self.population:
+                    if np.random.random() < self.pcros:
+                        self.crossover(network, rand.choice(self.population))
+
+            with phase(self.profiler, "evolve/tournament"):
+                self.population = self.tournament(data)
+            with phase(self.profiler, "evolve/best selection"):
+                current_best = self.get_best_network(data)
+                current_error, best_error = self.get_cached_fitness([current_best, best], data)
+                if current_error < best_error:
+                    best = current_best
+            if self.profiler is not None:
+                self.profiler.count("evolve/generations")
+            if callback is not None and callback(generation, self) is False:
+                break
 
         return best
 
+    def evolve_islands(self, data, islands=4, generations=5, migrations=4, migrants=1,
+                       mutation_factor=1/400, seed=0, processes=None, callback=None):
+        if len(self.population) // islands < 4:
+            raise ValueError("Every island needs at least 4 networks for the tournament")
+        populations = [self.population[i::islands] for i in range(islands)]
+        # imported here because multiprocessing is slow to import and only the island model needs it
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for epoch in range(migrations):
+                futures = [
+                    pool.submit(_evolve_island, population, self.pmut, self.pcros, data, generations, mutation_factor,
+                                int(np.random.SeedSequence([seed, epoch, idx]).generate_state(1)[0]))
+                    for idx, population in enumerate(populations)
+                ]
+                results = [future.result() for future in futures]
+                populations = [population for population, _ in results]
+
+                # ring topology: the best networks of each island replace the worst ones of the next island
+                order = [np.argsort(fitness, kind="stable") for _, fitness in results]
+                emigrants = [[populations[idx][i].copy() for i in order[idx][:migrants]]
+                             for idx in range(islands)]
+                for idx in range(islands):
+                    target = (idx + 1) % islands
+                    for position, network in zip(order[target][::-1][:migrants], emigrants[idx]):
+                        populations[target][position] = network
+
+                # islands stay contiguous in the population only for the callback, the next epoch keeps using
+                # the per-island lists
+                self.population = [network for population in populations for network in population]
+                if callback is not None and callback((epoch + 1) * generations, self) is False:
+                    break
+
+        self.population = [network for population in populations for network in population]
+        return self.get_best_network(data)
+
     def get_best_network(self, data):
-        best = self.population[0]
-        best_error = self.get_fitness(best, data)
-        for network in self.population[1:]:
-            current_error = self.get_fitness(network, data)
-            if current_error < best_error:
-                best = network
-                best_error = current_error
-        return best
+        return self.population[int(np.argmin(self.get_population_fitness(data)))]
 
     def get_average_error(self, data):
-        avg = sum([self.get_fitness(network, data) for network in self.population])
-        return avg/len(self.population)
+        return np.mean(self.get_population_fitness(data))
 
     def get_best_error(self, data):
-        network = self.get_best_network(data)
-        return self.get_fitness(network, data)
+        return np.min(self.get_population_fitness(data))
 
     def get_errors(self, data):
-        errors = []
-        for network in self.population:
-            errors.append(self.get_fitness(network, data))
-        return errors
+        return list(self.get_population_fitness(data))
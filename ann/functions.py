@@ -1,64 +1,150 @@
 import numpy as np
-from typing import Callable
+from typing import Callable, Optional
 
 
 class ActivationFunction:
     def __init__(self,
-                 function: Callable[[np.ndarray], np.ndarray],
-                 derivative: Callable[[np.ndarray], np.ndarray],
-                 name: str):
+                 function: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray],
+                 derivative: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray],
+                 name: str,
+                 output_derivative: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray] = None):
         self.function = function
         self.derivative = derivative
+        self.output_derivative = output_derivative
         self.name = name
 
-    def apply_on_tensor(self, tensor: np.ndarray) -> np.ndarray:
-        return self.function(tensor)
+    def apply_on_tensor(self, tensor: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        return self.function(tensor, out)
 
-    def get_gradient_from_tensor(self, tensor: np.ndarray) -> np.ndarray:
-        return self.derivative(tensor)
+    def get_gradient_from_tensor(self, tensor: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        return self.derivative(tensor, out)
 
-    def __call__(self, tensor: np.ndarray, gradient=False) -> np.ndarray:
-        return self.apply_on_tensor(tensor) if not gradient else self.derivative(tensor)
+    def get_gradient_from_output(self, tensor: np.ndarray, output: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        if self.output_derivative is not None:
+            return self.output_derivative(output, out)
+        return self.derivative(tensor, out)
 
+    def __call__(self, tensor: np.ndarray, gradient=False, out: np.ndarray = None) -> np.ndarray:
+        return self.apply_on_tensor(tensor, out) if not gradient else self.get_gradient_from_tensor(tensor, out)
 
-LINEAR = ActivationFunction(
-    np.vectorize(lambda x: x), 
-    np.vectorize(lambda x: 1), 
-    "LINEAR"
-)
-RELU = ActivationFunction(
-    np.vectorize(lambda x: max(x, 0.0)),
-    np.vectorize(lambda x: float(x > 0)),
-    "RELU"
-)
-LEAKY_RELU = ActivationFunction(
-    np.vectorize(lambda x: max(x, 0.1*x)),
-    np.vectorize(lambda x: 1.0 if x >= 0 else 0.1),
-    "LeakyRELU"    
-)
-SOFTPLUS = ActivationFunction(
-    lambda x: np.log(1 + np.exp(x)),
-    lambda x: 1 / (1 + np.exp(-x)),
-    "SOFTPLUS"
-)
-TANH = ActivationFunction(
-    lambda x: np.tanh(x),
-    lambda x: 1 - np.tanh(x) ** 2,
-    "TANH"
-)
-SIGMOID = ActivationFunction(
-    lambda x: 1 / (1 + np.exp(-x)),
-    lambda x: np.exp(-x) / (1 + np.exp(-x)) ** 2,
-    "SIGMOID"
-)
+    def __reduce__(self):
+        # pickled by name so that worker processes keep identity checks such as `is SOFTMAX` valid
+        return get_activation, (self.name,)
+
+
+def _buffer(tensor: np.ndarray, out: np.ndarray) -> np.ndarray:
+    if out is not None:
+        return out
+    tensor = np.asarray(tensor)
+    return np.empty_like(tensor, dtype=np.result_type(tensor, np.float32))
+
+
+def linear(tensor, out=None):
+    return np.positive(tensor, out=_buffer(tensor, out))
+
+
+def linear_derivative(tensor, out=None):
+    out = _buffer(tensor, out)
+    out.fill(1.0)
+    return out
+
+
+def relu(tensor, out=None):
+    return np.maximum(tensor, 0.0, out=_buffer(tensor, out))
+
+
+def relu_derivative(tensor, out=None):
+    return np.greater(tensor, 0.0, out=_buffer(tensor, out))
+
+
+def leaky_relu(tensor, out=None):
+    # scales the negative entries in place so that `out` may be `tensor`
+    out = np.positive(tensor, out=_buffer(tensor, out))
+    return np.multiply(out, 0.1, out=out, where=out < 0.0)
+
+
+def leaky_relu_derivative(tensor, out=None):
+    out = np.greater_equal(tensor, 0.0, out=_buffer(tensor, out))
+    out *= 0.9
+    out += 0.1
+    return out
+
+
+def softplus(tensor, out=None):
+    return np.logaddexp(tensor, 0.0, out=_buffer(tensor, out))
 
 
-def softmax_processing_function(tensor: np.ndarray) -> np.ndarray:
-    divisor = np.sum(np.exp(tensor))
-    return np.vectorize(lambda x: np.exp(x) / divisor)(tensor)
+def softplus_output_derivative(output, out=None):
+    # sigmoid(x) == 1 - exp(-softplus(x))
+    out = np.negative(output, out=_buffer(output, out))
+    np.expm1(out, out=out)
+    return np.negative(out, out=out)
 
 
-SOFTMAX = ActivationFunction(softmax_processing_function, None, "SOFTMAX")
+def tanh(tensor, out=None):
+    return np.tanh(tensor, out=_buffer(tensor, out))
+
+
+def tanh_output_derivative(output, out=None):
+    out = np.square(output, out=_buffer(output, out))
+    return np.subtract(1.0, out, out=out)
+
+
+def tanh_derivative(tensor, out=None):
+    return tanh_output_derivative(tanh(tensor, out), out)
+
+
+def sigmoid(tensor, out=None):
+    # 1 / (1 + exp(-x)) written as exp(-log(1 + exp(-x))) so that it never overflows
+    out = np.negative(tensor, out=_buffer(tensor, out))
+    np.logaddexp(out, 0.0, out=out)
+    np.negative(out, out=out)
+    return np.exp(out, out=out)
+
+
+def sigmoid_output_derivative(output, out=None):
+    out = _buffer(output, out)
+    if np.may_share_memory(out, output):
+        # 1 - output needs its own buffer when it would overwrite the output it is multiplied with
+        return np.multiply(output, np.subtract(1.0, output), out=out)
+    np.subtract(1.0, output, out=out)
+    return np.multiply(out, output, out=out)
+
+
+def sigmoid_derivative(tensor, out=None):
+    return sigmoid_output_derivative(sigmoid(tensor, out), out)
+
+
+def softmax(tensor, out=None):
+    out = np.subtract(tensor, np.max(tensor, axis=-1, keepdims=True), out=_buffer(tensor, out))
+    np.exp(out, out=out)
+    out /= np.sum(out, axis=-1, keepdims=True)
+    return out
+
+
+LINEAR = ActivationFunction(linear, linear_derivative, "LINEAR", linear_derivative)
+RELU = ActivationFunction(relu, relu_derivative, "RELU", relu_derivative)
+LEAKY_RELU = ActivationFunction(leaky_relu, leaky_relu_derivative, "LeakyRELU", leaky_relu_derivative)
+SOFTPLUS = ActivationFunction(softplus, sigmoid, "SOFTPLUS", softplus_output_derivative)
+TANH = ActivationFunction(tanh, tanh_derivative, "TANH", tanh_output_derivative)
+SIGMOID = ActivationFunction(sigmoid, sigmoid_derivative, "SIGMOID", sigmoid_output_derivative)
+SOFTMAX = ActivationFunction(softmax, None, "SOFTMAX")
+
+ACTIVATIONS = {function.name: function for function in (LINEAR, RELU, LEAKY_RELU, SOFTPLUS, TANH, SIGMOID, SOFTMAX)}
+ACTIVATION_ALIASES = {
+    "lin": LINEAR,
+    "ReLU": RELU,
+    "sig": SIGMOID,
+    "tanh": TANH
+}
+
+
+def get_activation(name: str) -> ActivationFunction:
+    if name in ACTIVATIONS:
+        return ACTIVATIONS[name]
+    if name in ACTIVATION_ALIASES:
+        return ACTIVATION_ALIASES[name]
+    raise ValueError(f"Unknown activation function: {name}")
 
 
 class LossFunction:
@@ -76,6 +162,9 @@ class LossFunction:
     def __call__(self, obtained: np.ndarray, expected: np.ndarray, gradient = False) -> np.ndarray:
         return self.calculate_loss(obtained, expected) if not gradient else self.calculate_gradient(obtained, expected)
 
+    def __reduce__(self):
+        return get_loss, (self.name,)
+
 
 def multi_class_log_loss(obtained_val: float, expected_val: float) -> float:
     return -expected_val * np.log(obtained_val) if expected_val != 0 else 0
@@ -97,6 +186,15 @@ MCCEL = LossFunction(
     "MULTI CLASS CROSS ENTROPY LOSS"
 )
 
+LOSSES = {function.name: function for function in (MSE, MAE, MCCEL)}
+
+
+def get_loss(name: str) -> LossFunction:
+    if name in LOSSES:
+        return LOSSES[name]
+    raise ValueError(f"Unknown loss function: {name}")
+
+
 if __name__ == "__main__":
     expected = np.array(((1, 0, 0),)).T
     obtained = np.array(((0.5, 0.3, 0.2),)).T
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+class FrozenNetwork:
+    # inference-only snapshot of a Network: transposed contiguous weights, bound activation kernels and per-layer
+    # buffers that are reused between calls, so instances must not be shared between threads
+    def __init__(self, network):
+        self.dtype = network.dtype
+        self.layers = network.layers
+        self.version = network.version
+        self.weights = [np.ascontiguousarray(weight.T) for weight in network.weights]
+        self.biases = [bias.copy() for bias in network.biases]
+        self.kernels = [function.function for function in network.functions]
+        self.vector_buffers = self.allocate(())
+        self.batch_buffers = self.allocate((0,))
+
+    def allocate(self, shape: tuple[int, ...]) -> list[tuple[np.ndarray, np.ndarray]]:
+        return [(np.empty(shape + (size,), dtype=self.dtype), np.empty(shape + (size,), dtype=self.dtype))
+                for size in self.layers[1:]]
+
+    def run(self, current: np.ndarray, buffers: list[tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        for weight, bias, kernel, (raw, output) in zip(self.weights, self.biases, self.kernels, buffers):
+            np.matmul(current, weight, out=raw)
+            raw += bias
+            current = kernel(raw, output)
+        return current.copy()
+
+    def calculate(self, input_vector: np.ndarray) -> np.ndarray:
+        return self.run(np.asarray(input_vector, dtype=self.dtype), self.vector_buffers)
+
+    def calculate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        if len(self.batch_buffers[0][0]) != len(inputs):
+            self.batch_buffers = self.allocate((len(inputs),))
+        return self.run(inputs, self.batch_buffers)
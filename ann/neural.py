@@ -1,18 +1,19 @@
+import copy
+import time
 import numpy as np
 import ann.functions as f
+from ann.inference import FrozenNetwork
+from ann.optimizers import Optimizer, SGD
 
 
-def to_batches(data, batch_size):
-    batches = []
-    k = 0
-    while k + batch_size <= len(data):
-        batches.append(data[k:k + batch_size])
-        k += batch_size
-    batches.append(data[k:])
-    return batches
+labeled_entry = tuple[np.ndarray, np.ndarray]
+CLIP_VALUE = 10.0
 
 
-labeled_entry = tuple[np.ndarray, np.ndarray]
+def to_arrays(data: list[labeled_entry], dtype=np.float64) -> tuple[np.ndarray, np.ndarray]:
+    inputs = np.array([entry for entry, _ in data], dtype=dtype)
+    labels = np.array([label for _, label in data], dtype=dtype).reshape(len(data), -1)
+    return inputs, labels
 
 
 class Network:
@@ -20,26 +21,119 @@ class Network:
                  layers: tuple[int, ...],
                  learning_rate: float,
                  functions: tuple[f.ActivationFunction, ...],
-                 loss_function: f.LossFunction):
+                 loss_function: f.LossFunction,
+                 dtype=np.float64,
+                 optimizer: Optimizer = None,
+                 parameters: np.ndarray = None):
         self.weight_sizes = [(layers[i + 1], layers[i]) for i in range(len(layers) - 1)]
         self.bias_sizes = [size for size in layers[1:]]
-        self.weights = [np.random.standard_normal(size) for size in self.weight_sizes]
-        self.biases = [np.random.standard_normal(size) for size in self.bias_sizes]
-        self.functions = functions
+        self.dtype = np.dtype(dtype)
+        self.layer_slices = []
+        offset = 0
+        for (rows, columns), size in zip(self.weight_sizes, self.bias_sizes):
+            self.layer_slices.append(slice(offset, offset + rows * columns + size))
+            offset += rows * columns + size
+        if parameters is not None:
+            if parameters.shape != (offset,) or parameters.dtype != self.dtype:
+                raise ValueError(f"Expected {offset} parameters of type {self.dtype}, "
+                                 f"got {parameters.shape} of type {parameters.dtype}")
+            self.set_parameter_buffer(parameters)
+        else:
+            self.set_parameter_buffer(np.empty(offset, dtype=self.dtype))
+            for weight in self.weights:
+                weight[...] = np.random.standard_normal(weight.shape)
+            for bias in self.biases:
+                bias[...] = np.random.standard_normal(bias.shape)
+        self.functions = tuple(f.get_activation(function) if isinstance(function, str) else function
+                               for function in functions)
         self.learning_rate = learning_rate
         self.loss_function = loss_function
-
-    def calculate_all(self, provided_input: np.ndarray) -> tuple[list[np.ndarray], list[np.ndarray]]:
-        current_output = provided_input
+        self.optimizer = optimizer if optimizer is not None else SGD()
+        self.clip_value = CLIP_VALUE
+        self.gradient = None
+        self.profiler = None
+        self.version = 0
+
+    @property
+    def layers(self) -> list[int]:
+        return [self.weight_sizes[0][1]] + self.bias_sizes
+
+    def parameter_views(self, buffer: np.ndarray) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        weights = []
+        biases = []
+        for layer, (rows, columns) in zip(self.layer_slices, self.weight_sizes):
+            split = layer.start + rows * columns
+            weights.append(buffer[..., layer.start:split].reshape(buffer.shape[:-1] + (rows, columns)))
+            biases.append(buffer[..., split:layer.stop])
+        return weights, biases
+
+    def set_parameter_buffer(self, buffer: np.ndarray) -> None:
+        self.parameters = buffer
+        self.weights, self.biases = self.parameter_views(buffer)
+
+    def gradient_buffer(self) -> np.ndarray:
+        # reused by every backpropagation step, the per-layer views are written to directly
+        if self.gradient is None or self.gradient.shape != self.parameters.shape or \
+                self.gradient.dtype != self.parameters.dtype:
+            self.gradient = np.empty(self.parameters.shape, dtype=self.parameters.dtype)
+            self.gradient_weights, self.gradient_biases = self.parameter_views(self.gradient)
+        return self.gradient
+
+    def get_parameters(self) -> np.ndarray:
+        return self.parameters.copy()
+
+    def set_parameters(self, parameters: np.ndarray) -> None:
+        self.parameters[...] = parameters
+        self.version += 1
+
+    def copy(self) -> "Network":
+        network = copy.copy(self)
+        network.set_parameter_buffer(self.parameters.copy())
+        network.optimizer = self.optimizer.copy()
+        network.gradient = None
+        return network
+
+    def freeze(self) -> FrozenNetwork:
+        return FrozenNetwork(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["weights"], state["biases"]
+        state.pop("gradient_weights", None)
+        state.pop("gradient_biases", None)
+        state["gradient"] = None
+        state["profiler"] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("clip_value", CLIP_VALUE)
+        state.setdefault("gradient", None)
+        self.__dict__.update(state)
+        self.set_parameter_buffer(self.parameters)
+
+    def calculate_all_batch(self, inputs: np.ndarray) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        current_output = np.asarray(inputs, dtype=self.dtype)
         raw_outputs = []
         func_outputs = []
-        for weight, bias, function in zip(self.weights, self.biases, self.functions):
-            raw = weight @ current_output + bias.T
+        profiler = self.profiler
+        for idx, (weight, bias, function) in enumerate(zip(self.weights, self.biases, self.functions)):
+            if profiler is not None:
+                start = time.perf_counter()
+            raw = current_output @ weight.T + bias
             raw_outputs.append(raw)
             current_output = function(raw)
             func_outputs.append(current_output)
+            if profiler is not None:
+                profiler.add(f"forward/layer {idx + 1}", time.perf_counter() - start, 2 * weight.size * len(raw))
         return raw_outputs, func_outputs
 
+    def calculate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        return self.calculate_all_batch(inputs)[1][-1]
+
+    def calculate_all(self, provided_input: np.ndarray) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        raw_outputs, func_outputs = self.calculate_all_batch(np.atleast_2d(provided_input))
+        return [raw[0] for raw in raw_outputs], [output[0] for output in func_outputs]
+
     def calculate(self, input_vector: np.ndarray):
         return self.calculate_all(input_vector)[1][-1]
 
@@ -49,49 +143,71 @@ class Network:
     def calculate_gradients(self, raw_outputs, func_outputs, expected):
         loss_gradient = self.loss_function(func_outputs[-1], expected, gradient=True)
         gradients = [loss_gradient * self.get_derivative(raw_outputs, func_outputs, len(self.weights) - 1, expected)]
+        profiler = self.profiler
         for idx, weight in enumerate(self.weights[:0:-1]):
+            if profiler is not None:
+                start = time.perf_counter()
             gradients.append(
-                (weight.T @ gradients[-1]) * self.get_derivative(raw_outputs, func_outputs, len(self.weights) - idx - 2, expected)
+                (gradients[-1] @ weight) * self.get_derivative(raw_outputs, func_outputs, len(self.weights) - idx - 2, expected)
             )
+            if profiler is not None:
+                profiler.add(f"backward/layer {len(self.weights) - idx}/delta", time.perf_counter() - start,
+                             2 * weight.size * len(gradients[-1]))
         return gradients[::-1]
 
     def get_derivative(self, raw_outputs, func_outputs, layer_index, expected):
-        if self.functions[layer_index] is f.SIGMOID:
-            return func_outputs[layer_index] * (1 - func_outputs[layer_index])
         if self.functions[layer_index] is f.SOFTMAX:
-            return func_outputs[layer_index] - np.array((expected,)).T
-        return self.functions[layer_index](raw_outputs[layer_index], gradient=True)
+            return func_outputs[layer_index] - expected
+        return self.functions[layer_index].get_gradient_from_output(raw_outputs[layer_index], func_outputs[layer_index])
 
     def update_gradients_and_deltas(self,
-                                    input_vector: np.ndarray,
+                                    inputs: np.ndarray,
                                     expected: np.ndarray,
                                     delta_weights: list,
-                                    delta_biases: list) -> None:
-        raw_outputs, func_outputs = self.calculate_all(input_vector)
+                                    delta_biases: list,
+                                    accumulate: bool = True) -> None:
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=self.dtype))
+        expected = np.asarray(expected, dtype=self.dtype).reshape(len(inputs), -1)
+        raw_outputs, func_outputs = self.calculate_all_batch(inputs)
         gradients = self.calculate_gradients(raw_outputs, func_outputs, expected)
-        for i in reversed(range(1, len(func_outputs))):
-            delta_biases[i] += gradients[i]
-            delta_weights[i] += np.outer(gradients[i], func_outputs[i - 1].T)
-        delta_biases[0] += gradients[0]
-        delta_weights[0] += np.outer(gradients[0], input_vector)
-
-    def backpropagation(self, training_data: list[labeled_entry], validation_data: list[labeled_entry]) -> float:
+        profiler = self.profiler
+        for i in reversed(range(len(func_outputs))):
+            if profiler is not None:
+                start = time.perf_counter()
+            layer_input = func_outputs[i - 1] if i > 0 else inputs
+            if accumulate:
+                delta_biases[i] += gradients[i].sum(axis=0)
+                delta_weights[i] += gradients[i].T @ layer_input
+            else:
+                np.sum(gradients[i], axis=0, out=delta_biases[i])
+                np.matmul(gradients[i].T, layer_input, out=delta_weights[i])
+            if profiler is not None:
+                profiler.add(f"backward/layer {i + 1}/weights", time.perf_counter() - start,
+                             2 * delta_weights[i].size * len(inputs))
+
+    def backpropagation_batch(self, inputs: np.ndarray, labels: np.ndarray) -> None:
+        if len(inputs) == 0:
+            return
+        gradient = self.gradient_buffer()
+        self.update_gradients_and_deltas(inputs, labels, self.gradient_weights, self.gradient_biases, accumulate=False)
+        self.apply_gradient(gradient, len(inputs))
+
+    def apply_gradient(self, gradient: np.ndarray, count: int) -> None:
+        # gradient holds the summed gradient of `count` samples and is scaled in place
+        gradient /= count
+        self.optimizer.step(self.parameters, gradient, self.learning_rate)
+        if self.clip_value is not None:
+            np.clip(self.parameters, -self.clip_value, self.clip_value, out=self.parameters)
+        self.version += 1
+
+    def backpropagation(self, training_data: list[labeled_entry], validation_data: list[labeled_entry] = ()) -> float:
         if len(training_data) == 0:
             return 0.0
-        delta_weights = [0] * len(self.weights)
-        delta_biases = [0] * len(self.weights)
-        for entry, label in training_data:
-            self.update_gradients_and_deltas(entry, label, delta_weights, delta_biases)
-
-        for i, _ in enumerate(delta_weights):
-            delta_weights[i] /= len(training_data)
-            delta_biases[i] /= len(training_data)
-            self.weights[i] -= self.learning_rate * delta_weights[i]
-            self.biases[i] -= self.learning_rate * delta_biases[i].T
-            self.weights[i] = np.clip(self.weights[i], -10, 10)
-            self.biases[i] = np.clip(self.biases[i], -10, 10)
-
-        return sum([self.get_error(self.calculate(entry), label) for entry, label in validation_data])
+        self.backpropagation_batch(*to_arrays(training_data, self.dtype))
+        if len(validation_data) == 0:
+            return 0.0
+        inputs, labels = to_arrays(validation_data, self.dtype)
+        return self.get_error(self.calculate_batch(inputs), labels)
 
     def print_net(self):
         print("--------------------------------------------------", end='')
@@ -0,0 +1,150 @@
+import copy
+import numpy as np
+
+
+class LearningRateSchedule:
+    name = "Constant"
+
+    def __call__(self, learning_rate: float, step: int) -> float:
+        return learning_rate
+
+
+class StepDecay(LearningRateSchedule):
+    name = "Step decay"
+
+    def __init__(self, every: int = 500, factor: float = 0.5):
+        self.every = every
+        self.factor = factor
+
+    def __call__(self, learning_rate: float, step: int) -> float:
+        return learning_rate * self.factor ** (step // self.every)
+
+
+class ExponentialDecay(LearningRateSchedule):
+    name = "Exponential decay"
+
+    def __init__(self, rate: float = 0.999):
+        self.rate = rate
+
+    def __call__(self, learning_rate: float, step: int) -> float:
+        return learning_rate * self.rate ** step
+
+
+class Optimizer:
+    name = None
+    state_names = ()
+
+    def __init__(self, schedule: LearningRateSchedule = None):
+        self.schedule = schedule if schedule is not None else LearningRateSchedule()
+        self.iterations = 0
+        self.state = {}
+        self.scratch = None
+
+    def initialize(self, parameters: np.ndarray) -> None:
+        self.state = {name: np.zeros_like(parameters) for name in self.state_names}
+        self.scratch = np.empty_like(parameters)
+
+    def step(self, parameters: np.ndarray, gradient: np.ndarray, learning_rate: float) -> None:
+        if self.scratch is None or self.scratch.shape != parameters.shape or self.scratch.dtype != parameters.dtype:
+            self.initialize(parameters)
+        self.iterations += 1
+        self.update(parameters, gradient, self.schedule(learning_rate, self.iterations))
+
+    def update(self, parameters: np.ndarray, gradient: np.ndarray, learning_rate: float) -> None:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        self.iterations = 0
+        self.state = {}
+        self.scratch = None
+
+    def copy(self) -> "Optimizer":
+        return copy.deepcopy(self)
+
+
+class SGD(Optimizer):
+    name = "SGD"
+
+    def update(self, parameters, gradient, learning_rate):
+        np.multiply(gradient, learning_rate, out=self.scratch)
+        parameters -= self.scratch
+
+
+class Momentum(Optimizer):
+    name = "Momentum"
+    state_names = ("velocity",)
+
+    def __init__(self, schedule: LearningRateSchedule = None, momentum: float = 0.9):
+        super().__init__(schedule)
+        self.momentum = momentum
+
+    def update(self, parameters, gradient, learning_rate):
+        velocity = self.state["velocity"]
+        velocity *= self.momentum
+        np.multiply(gradient, learning_rate, out=self.scratch)
+        velocity -= self.scratch
+        parameters += velocity
+
+
+class RMSProp(Optimizer):
+    name = "RMSProp"
+    state_names = ("square_average",)
+
+    def __init__(self, schedule: LearningRateSchedule = None, rho: float = 0.9, epsilon: float = 1e-7):
+        super().__init__(schedule)
+        self.rho = rho
+        self.epsilon = epsilon
+
+    def update(self, parameters, gradient, learning_rate):
+        square_average = self.state["square_average"]
+        square_average *= self.rho
+        np.square(gradient, out=self.scratch)
+        self.scratch *= 1 - self.rho
+        square_average += self.scratch
+        np.sqrt(square_average, out=self.scratch)
+        self.scratch += self.epsilon
+        np.divide(gradient, self.scratch, out=self.scratch)
+        self.scratch *= learning_rate
+        parameters -= self.scratch
+
+
+class Adam(Optimizer):
+    name = "Adam"
+    state_names = ("first_moment", "second_moment")
+
+    def __init__(self, schedule: LearningRateSchedule = None,
+                 beta1: float = 0.9, beta2: float = 0.999, epsilon: float = 1e-7):
+        super().__init__(schedule)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+
+    def update(self, parameters, gradient, learning_rate):
+        first_moment = self.state["first_moment"]
+        second_moment = self.state["second_moment"]
+        first_moment *= self.beta1
+        np.multiply(gradient, 1 - self.beta1, out=self.scratch)
+        first_moment += self.scratch
+        second_moment *= self.beta2
+        np.square(gradient, out=self.scratch)
+        self.scratch *= 1 - self.beta2
+        second_moment += self.scratch
+
+        step_size = learning_rate * np.sqrt(1 - self.beta2 ** self.iterations) / (1 - self.beta1 ** self.iterations)
+        np.sqrt(second_moment, out=self.scratch)
+        self.scratch += self.epsilon
+        np.divide(first_moment, self.scratch, out=self.scratch)
+        self.scratch *= step_size
+        parameters -= self.scratch
+
+
+OPTIMIZERS = {optimizer.name: optimizer for optimizer in (SGD, Momentum, RMSProp, Adam)}
+SCHEDULES = {schedule.name: schedule for schedule in (LearningRateSchedule, StepDecay, ExponentialDecay)}
+
+
+def get_optimizer(name: str, schedule: str = "Constant") -> Optimizer:
+    if name not in OPTIMIZERS:
+        raise ValueError(f"Unknown optimizer: {name}")
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown learning rate schedule: {schedule}")
+    return OPTIMIZERS[name](SCHEDULES[schedule]())
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from ann.data import Dataset
+from ann.neural import Network
+
+_worker = {}
+
+
+def _attach(description: tuple[str, tuple[int, ...], str]) -> tuple[SharedMemory, np.ndarray]:
+    name, shape, dtype = description
+    memory = SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+
+
+def _initialize_worker(network: Network, descriptions: dict) -> None:
+    arrays = {}
+    for key, description in descriptions.items():
+        memory, arrays[key] = _attach(description)
+        _worker.setdefault("memory", []).append(memory)
+    # the worker's network reads the parameters the parent updates, so it never has to be sent again
+    network.set_parameter_buffer(arrays["parameters"])
+    _worker["network"] = network
+    _worker["arrays"] = arrays
+    _worker["views"] = [network.parameter_views(row) for row in arrays["gradients"]]
+
+
+def _shard_gradient(row: int, start: int, stop: int) -> None:
+    arrays = _worker["arrays"]
+    indices = arrays["indices"][start:stop]
+    delta_weights, delta_biases = _worker["views"][row]
+    _worker["network"].update_gradients_and_deltas(arrays["features"][indices], arrays["labels"][indices],
+                                                   delta_weights, delta_biases, accumulate=False)
+
+
+class ParallelTrainer:
+    # data-parallel backpropagation: the dataset, the parameters and one gradient row per shard live in shared
+    # memory, workers fill their rows from their slice of each batch and the parent reduces them and steps
+    def __init__(self, network: Network, dataset: Dataset, processes: int = None):
+        self.network = network
+        self.dataset = dataset
+        self.processes = processes or os.cpu_count()
+        self.memory = []
+        self.arrays = {}
+        self.descriptions = {}
+        self.share("features", np.asarray(dataset.features, dtype=network.dtype))
+        self.share("labels", np.asarray(dataset.labels, dtype=network.dtype))
+        self.share("indices", np.arange(len(dataset)))
+        self.share("parameters", network.parameters)
+        self.share("gradients", np.zeros((self.processes, len(network.parameters)), dtype=network.dtype))
+        network.set_parameter_buffer(self.arrays["parameters"])
+        self.pool = ProcessPoolExecutor(self.processes, initializer=_initialize_worker,
+                                        initargs=(network, self.descriptions))
+
+    def share(self, key: str, array: np.ndarray) -> None:
+        memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.memory.append(memory)
+        self.arrays[key] = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+        self.arrays[key][...] = array
+        self.descriptions[key] = (memory.name, array.shape, array.dtype.str)
+
+    def backpropagation_batch(self, indices) -> None:
+        indices = np.arange(len(self.dataset))[indices]
+        if len(indices) == 0:
+            return
+        self.arrays["indices"][:len(indices)] = indices
+        bounds = np.linspace(0, len(indices), min(self.processes, len(indices)) + 1).astype(int)
+        futures = [self.pool.submit(_shard_gradient, row, start, stop)
+                   for row, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))]
+        for future in futures:
+            future.result()
+        gradient = self.network.gradient_buffer()
+        np.sum(self.arrays["gradients"][:len(futures)], axis=0, out=gradient)
+        self.network.apply_gradient(gradient, len(indices))
+
+    def train_epoch(self, batch_size: int, shuffle: bool = True, rng=np.random) -> None:
+        for indices in self.dataset.batch_indices(batch_size, shuffle, rng):
+            self.backpropagation_batch(indices)
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        # the network keeps training in its own memory once the shared blocks are gone
+        self.network.set_parameter_buffer(self.arrays["parameters"].copy())
+        self.arrays.clear()
+        for memory in self.memory:
+            memory.close()
+            memory.unlink()
+        self.memory.clear()
+
+    def __enter__(self) -> "ParallelTrainer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
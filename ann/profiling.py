@@ -0,0 +1,60 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable
+
+NO_PROFILING = nullcontext()
+
+
+class Profiler:
+    def __init__(self, callback: Callable[["Profiler"], None] = None):
+        self.callback = callback
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.flops = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def add(self, key: str, seconds: float, flops: int = 0) -> None:
+        self.timings[key] += seconds
+        self.calls[key] += 1
+        self.flops[key] += flops
+
+    def count(self, key: str, amount: int = 1) -> None:
+        self.counters[key] += amount
+
+    @contextmanager
+    def phase(self, key: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(key, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.calls.clear()
+        self.flops.clear()
+        self.counters.clear()
+
+    def report(self) -> None:
+        if self.callback is not None:
+            self.callback(self)
+
+    def summary(self) -> dict:
+        return {
+            "timings": {
+                key: {"seconds": seconds, "calls": self.calls[key], "gflops": self.flops[key] / max(seconds, 1e-12) / 1e9}
+                for key, seconds in self.timings.items()
+            },
+            "counters": dict(self.counters)
+        }
+
+    def format(self, limit: int = 6) -> str:
+        lines = [f"{key}: {seconds * 1000:.1f} ms"
+                 for key, seconds in sorted(self.timings.items(), key=lambda item: -item[1])[:limit]]
+        lines += [f"{key}: {value}" for key, value in sorted(self.counters.items())]
+        return "\n".join(lines)
+
+
+def phase(profiler: Profiler, key: str):
+    return profiler.phase(key) if profiler is not None else NO_PROFILING
@@ -0,0 +1,185 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random as rand
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import ann.functions as f
+from ann.data import Dataset
+from ann.ens import EvolutionaryNetworkSystem
+from ann.neural import Network
+from ann.training import TrainingController
+
+logger = logging.getLogger("ann")
+
+# the activations the settings window offers for hidden layers
+SWEEP_ACTIVATIONS = ["sig", "lin", "ReLU", "tanh"]
+TRAIN_SPACE = {
+    "hidden": [[8], [8, 8], [16, 16], [8, 8, 4]],
+    "activation": SWEEP_ACTIVATIONS,
+    "learning_rate": [0.01, 0.045, 0.1, 0.3]
+}
+EVOLVE_SPACE = {
+    "hidden": [[8], [8, 8], [8, 8, 4]],
+    "activation": SWEEP_ACTIVATIONS,
+    "learning_rate": [0.045],
+    "pop_size": [12, 20, 40],
+    "pmut": [0.3, 0.6, 0.9],
+    "pcros": [0.25, 0.5, 0.75]
+}
+SPACES = {"train": TRAIN_SPACE, "evolve": EVOLVE_SPACE}
+
+_worker = {}
+
+
+def grid_configs(method: str, space: dict = None) -> list[dict]:
+    space = space if space is not None else SPACES[method]
+    names = sorted(space)
+    return [dict(zip(names, values), method=method) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_configs(method: str, count: int, space: dict = None, rng=np.random) -> list[dict]:
+    space = space if space is not None else SPACES[method]
+    names = sorted(space)
+    return [{**{name: space[name][rng.randint(len(space[name]))] for name in names}, "method": method}
+            for _ in range(count)]
+
+
+def dataset_hash(dataset: Dataset) -> str:
+    digest = hashlib.sha256()
+    for array in (dataset.features, dataset.labels):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def trial_key(config: dict, settings: dict, data_hash: str) -> str:
+    payload = json.dumps({"config": config, "settings": settings, "data": data_hash}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _initialize_worker(features: np.ndarray, labels: np.ndarray) -> None:
+    _worker["dataset"] = Dataset(features, labels)
+
+
+def _create_trial(config: dict, dataset: Dataset, dtype):
+    layers = [dataset.features.shape[1]] + list(config["hidden"]) + [dataset.labels.shape[1]]
+    functions = [config["activation"]] * len(config["hidden"]) + ["sig"]
+    if config["method"] == "evolve":
+        return EvolutionaryNetworkSystem(config["pop_size"], config["pmut"], config["pcros"], layers,
+                                         config["learning_rate"], functions, f.MSE, dtype)
+    return Network(layers, config["learning_rate"], functions, f.MSE, dtype)
+
+
+def _advance_trial(config: dict, settings: dict, seed: int, state, round_index: int):
+    # every round reseeds from the trial key, so a trial's history does not depend on the worker that ran it
+    start = time.perf_counter()
+    rand.seed(seed + round_index)
+    np.random.seed((seed + round_index) % 2 ** 32)
+    dataset = _worker["dataset"]
+    if state is None:
+        state = _create_trial(config, dataset, np.dtype(settings["dtype"]))
+    if config["method"] == "evolve":
+        state.evolve(dataset, settings["steps_per_round"])
+        network = state.get_best_network(dataset)
+    else:
+        for _ in range(settings["steps_per_round"]):
+            for inputs, labels in dataset.batches(settings["batch_size"]):
+                state.backpropagation_batch(inputs, labels)
+        network = state
+    accuracy, loss = TrainingController(network).evaluate(dataset.features, dataset.labels)
+    return state, loss, accuracy, time.perf_counter() - start
+
+
+class SweepCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str):
+        try:
+            with open(self.path(key)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, result: dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self.path(key) + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(result, file, indent=2)
+        os.replace(temporary, self.path(key))
+
+
+def run_sweep(dataset: Dataset,
+              configs: list[dict],
+              rounds: int = 5,
+              steps_per_round: int = 20,
+              batch_size: int = 16,
+              warmup_rounds: int = 1,
+              cache_directory: str = ".sweep_cache",
+              processes: int = None,
+              dtype=np.float32) -> list[dict]:
+    # trials advance in lockstep rounds on the pool, after the warmup rounds a trial whose loss is worse than the
+    # median of every trial of the same method that reached the same round (cached ones included) is pruned
+    settings = {"rounds": rounds, "steps_per_round": steps_per_round, "batch_size": batch_size,
+                "warmup_rounds": warmup_rounds, "dtype": np.dtype(dtype).str}
+    cache = SweepCache(cache_directory)
+    data_hash = dataset_hash(dataset)
+    results = {}
+    live = {}
+    for config in configs:
+        key = trial_key(config, settings, data_hash)
+        if key in results or key in live:
+            continue
+        cached = cache.load(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            live[key] = {"config": config, "losses": [], "accuracies": [], "state": None, "seconds": 0.0,
+                         "seed": int(key[:8], 16)}
+    logger.info("Sweep of %d trials, %d cached", len(results) + len(live), len(results))
+
+    features = np.asarray(dataset.features, dtype=dtype)
+    labels = np.asarray(dataset.labels, dtype=dtype)
+    with ProcessPoolExecutor(processes, initializer=_initialize_worker, initargs=(features, labels)) as pool:
+        for round_index in range(rounds):
+            if not live:
+                break
+            futures = {key: pool.submit(_advance_trial, trial["config"], settings, trial["seed"], trial["state"],
+                                        round_index)
+                       for key, trial in live.items()}
+            for key, future in futures.items():
+                trial = live[key]
+                trial["state"], loss, accuracy, seconds = future.result()
+                trial["losses"].append(loss)
+                trial["accuracies"].append(accuracy)
+                trial["seconds"] += seconds
+
+            # trained networks and evolved populations reach very different losses per round, so each is only
+            # compared against trials of its own method
+            reached = {}
+            for trial in itertools.chain(results.values(), live.values()):
+                if len(trial["losses"]) > round_index:
+                    reached.setdefault(trial["config"]["method"], []).append(trial["losses"][round_index])
+            medians = {method: float(np.median(losses)) for method, losses in reached.items()}
+            for key in list(live):
+                trial = live[key]
+                pruned = round_index >= warmup_rounds and trial["losses"][-1] > medians[trial["config"]["method"]]
+                if pruned or round_index == rounds - 1:
+                    results[key] = {"config": trial["config"], "losses": trial["losses"],
+                                    "accuracies": trial["accuracies"], "loss": trial["losses"][-1],
+                                    "accuracy": trial["accuracies"][-1], "pruned": pruned,
+                                    "seconds": trial["seconds"]}
+                    cache.store(key, results[key])
+                    del live[key]
+                    logger.info("%s after round %d: loss %.6f, accuracy %.4f %s", "Pruned" if pruned else "Finished",
+                                round_index + 1, trial["losses"][-1], trial["accuracies"][-1],
+                                json.dumps(trial["config"]))
+    return sorted(results.values(), key=lambda result: (result["pruned"], result["loss"]))
@@ -0,0 +1,85 @@
+import numpy as np
+from ann.data import Dataset
+from ann.neural import Network
+
+
+class TrainingController:
+    def __init__(self,
+                 network: Network,
+                 patience: int = 250,
+                 min_delta: float = 1e-4,
+                 target_accuracy: float = 1.0,
+                 threshold: float = 0.5,
+                 chunk_size: int = None):
+        self.network = network
+        self.patience = patience
+        self.min_delta = min_delta
+        self.target_accuracy = target_accuracy
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.best_parameters = network.get_parameters()
+        self.best_accuracy = -1.0
+        self.best_loss = np.inf
+        self.best_epoch = 0
+        self.epoch = 0
+        self.stale_epochs = 0
+        self.last_correct = None
+
+    def evaluate(self, inputs: np.ndarray, labels: np.ndarray) -> tuple[float, float]:
+        # chunked so that memory-mapped datasets are never materialized as a whole
+        chunk_size = self.chunk_size or max(len(inputs), 1)
+        correct = np.empty(len(inputs), dtype=bool)
+        loss = 0.0
+        for start in range(0, len(inputs), chunk_size):
+            outputs = self.network.calculate_batch(inputs[start:start + chunk_size])
+            expected = np.asarray(labels[start:start + chunk_size], dtype=outputs.dtype).reshape(len(outputs), -1)
+            if outputs.shape[-1] == 1:
+                chunk_correct = (outputs >= self.threshold) == (expected >= self.threshold)
+            else:
+                chunk_correct = np.argmax(outputs, axis=-1) == np.argmax(expected, axis=-1)
+            correct[start:start + len(outputs)] = chunk_correct.reshape(len(outputs))
+            loss += self.network.get_error(outputs, expected)
+        self.last_correct = correct
+        return float(np.mean(correct)), float(loss / len(inputs))
+
+    def update(self, inputs: np.ndarray, labels: np.ndarray) -> bool:
+        self.epoch += 1
+        accuracy, loss = self.evaluate(inputs, labels)
+        if accuracy > self.best_accuracy or (accuracy == self.best_accuracy and loss < self.best_loss - self.min_delta):
+            np.copyto(self.best_parameters, self.network.parameters)
+            self.best_accuracy = accuracy
+            self.best_loss = loss
+            self.best_epoch = self.epoch
+            self.stale_epochs = 0
+        else:
+            self.stale_epochs += 1
+        return accuracy >= self.target_accuracy or self.stale_epochs >= self.patience
+
+    def restore_best(self) -> None:
+        self.network.set_parameters(self.best_parameters)
+
+
+def incremental_update(network: Network,
+                       dataset: Dataset,
+                       focus_features: np.ndarray,
+                       focus_labels: np.ndarray,
+                       steps: int = 25,
+                       batch_size: int = 16,
+                       rng=np.random) -> float:
+    # warm start from the current parameters: every step trains on the new points, the currently misclassified
+    # points and a random filler, and the best parameters seen are kept
+    focus_labels = focus_labels.reshape(len(focus_labels), -1)
+    controller = TrainingController(network, patience=steps)
+    for step in range(steps + 1):
+        if controller.update(dataset.features, dataset.labels) or step == steps:
+            break
+        misclassified = np.flatnonzero(~controller.last_correct)
+        rng.shuffle(misclassified)
+        indices = misclassified[:max(batch_size - len(focus_features), 0)]
+        if len(focus_features) + len(indices) < batch_size:
+            filler = rng.choice(len(dataset), batch_size - len(focus_features) - len(indices))
+            indices = np.concatenate((indices, filler))
+        network.backpropagation_batch(np.concatenate((focus_features, dataset.features[indices])),
+                                      np.concatenate((focus_labels, dataset.labels[indices])))
+    controller.restore_best()
+    return controller.best_accuracy
@@ -1,37 +1,50 @@
 import sys
-from threading import Thread, Lock
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QApplication
 from application.main_window import Window
 from application.network_manager import NetworkManager
 from application.painter import Painter
-from application.settings import SettingsWindow
+from application.scheduler import BACKPROPAGATION, EVOLUTION, INCREMENTAL, TrainingScheduler
 
 
 class App:
     def __init__(self):
         self.app = QApplication(sys.argv)
-        self.settings_window = SettingsWindow(parent_app=self)
+        self._settings_window = None
         self.window = Window(parent_app=self)
         self.netmanager = NetworkManager(parent_app=self)
         self.painter = Painter(self.window.image, QPixmap(700, 700))
-        self.worker_busy = False
+        self.scheduler = TrainingScheduler(self.train)
+        self.scheduler.progress.connect(self.netmanager.progressReport)
+        self.scheduler.finished.connect(self.training_finished)
 
-    def train_network(self):
-        if not self.worker_busy:
-            self.worker_busy = True
-            worker_thread = Thread(target=self.train_and_paint)
-            worker_thread.start()
+    @property
+    def settings_window(self):
+        # the settings window renders its own scene, so it is only built when it is first opened
+        if self._settings_window is None:
+            from application.settings import SettingsWindow
+            self._settings_window = SettingsWindow(parent_app=self)
+        return self._settings_window
+
+    def train_network(self, incremental=False):
+        if not self.window.BackButton.isChecked():
+            self.scheduler.request(EVOLUTION)
+        elif incremental:
+            self.scheduler.request(INCREMENTAL)
+        else:
+            self.scheduler.request(BACKPROPAGATION)
 
     def update_learning_rate(self):
         lr = 0.001 + self.window.LearningSlider.value() * 0.01
         self.netmanager.update_learning_rate(lr)
 
     def reset_network(self):
+        self.scheduler.cancel()
         self.netmanager.reset_network()
         self.update_screen()
 
     def clear_map(self):
+        self.scheduler.cancel()
         self.painter.reset_image()
         self.netmanager.clear_points()
 
@@ -43,10 +56,14 @@ class App:
         self.window.show()
         sys.exit(self.app.exec_())
 
-    def train_and_paint(self):
-        if self.window.BackButton.isChecked():
-            self.netmanager.machine_learning()
+    def train(self, kind, cancelled, progress):
+        if kind == INCREMENTAL:
+            self.netmanager.incremental_learning(cancelled, progress)
+        elif kind == BACKPROPAGATION:
+            self.netmanager.machine_learning(cancelled, progress)
         else:
-            self.netmanager.evolve_network()
+            self.netmanager.evolve_network(cancelled, progress)
+
+    def training_finished(self):
+        self.netmanager.report_stats()
         self.update_screen()
-        self.worker_busy = False
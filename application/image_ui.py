@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'application/resource/Image.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(964, 739)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.image = QtWidgets.QLabel(self.centralwidget)
+        self.image.setMinimumSize(QtCore.QSize(700, 700))
+        self.image.setStyleSheet("")
+        self.image.setText("")
+        self.image.setObjectName("image")
+        self.gridLayout.addWidget(self.image, 0, 3, 1, 1)
+        self.frame_2 = QtWidgets.QFrame(self.centralwidget)
+        self.frame_2.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_2.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_2.setObjectName("frame_2")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.frame_2)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.CustomizeButton = QtWidgets.QPushButton(self.frame_2)
+        self.CustomizeButton.setObjectName("CustomizeButton")
+        self.gridLayout_2.addWidget(self.CustomizeButton, 0, 0, 1, 1)
+        self.ClearButton = QtWidgets.QPushButton(self.frame_2)
+        self.ClearButton.setObjectName("ClearButton")
+        self.gridLayout_2.addWidget(self.ClearButton, 8, 0, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(20, 452, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout_2.addItem(spacerItem, 4, 0, 1, 1)
+        self.PredictButton = QtWidgets.QPushButton(self.frame_2)
+        self.PredictButton.setObjectName("PredictButton")
+        self.gridLayout_2.addWidget(self.PredictButton, 9, 0, 1, 1)
+        self.horizontalLayout_9 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_9.setObjectName("horizontalLayout_9")
+        self.label_9 = QtWidgets.QLabel(self.frame_2)
+        self.label_9.setObjectName("label_9")
+        self.horizontalLayout_9.addWidget(self.label_9)
+        self.LearningSlider = QtWidgets.QSlider(self.frame_2)
+        self.LearningSlider.setOrientation(QtCore.Qt.Horizontal)
+        self.LearningSlider.setObjectName("LearningSlider")
+        self.horizontalLayout_9.addWidget(self.LearningSlider)
+        self.gridLayout_2.addLayout(self.horizontalLayout_9, 11, 0, 1, 1)
+        self.EvolutionButton = QtWidgets.QRadioButton(self.frame_2)
+        self.EvolutionButton.setAutoExclusive(True)
+        self.EvolutionButton.setObjectName("EvolutionButton")
+        self.gridLayout_2.addWidget(self.EvolutionButton, 3, 0, 1, 1)
+        self.label_2 = QtWidgets.QLabel(self.frame_2)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout_2.addWidget(self.label_2, 5, 0, 1, 1)
+        self.BackButton = QtWidgets.QRadioButton(self.frame_2)
+        self.BackButton.setObjectName("BackButton")
+        self.gridLayout_2.addWidget(self.BackButton, 2, 0, 1, 1)
+        self.AutoButton = QtWidgets.QRadioButton(self.frame_2)
+        self.AutoButton.setAutoExclusive(False)
+        self.AutoButton.setObjectName("AutoButton")
+        self.gridLayout_2.addWidget(self.AutoButton, 7, 0, 1, 1)
+        self.ResetButton = QtWidgets.QPushButton(self.frame_2)
+        self.ResetButton.setObjectName("ResetButton")
+        self.gridLayout_2.addWidget(self.ResetButton, 10, 0, 1, 1)
+        self.label = QtWidgets.QLabel(self.frame_2)
+        self.label.setObjectName("label")
+        self.gridLayout_2.addWidget(self.label, 1, 0, 1, 1)
+        self.horizontalLayout_10 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_10.setObjectName("horizontalLayout_10")
+        self.CounterLabel = QtWidgets.QLabel(self.frame_2)
+        self.CounterLabel.setObjectName("CounterLabel")
+        self.horizontalLayout_10.addWidget(self.CounterLabel)
+        self.StatsLabel = QtWidgets.QLabel(self.frame_2)
+        self.StatsLabel.setText("")
+        self.StatsLabel.setObjectName("StatsLabel")
+        self.horizontalLayout_10.addWidget(self.StatsLabel)
+        self.gridLayout_2.addLayout(self.horizontalLayout_10, 6, 0, 1, 1)
+        self.gridLayout.addWidget(self.frame_2, 0, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 964, 21))
+        self.menubar.setObjectName("menubar")
+        MainWindow.setMenuBar(self.menubar)
+
+        self.retranslateUi(MainWindow)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
+        self.CustomizeButton.setText(_translate("MainWindow", "Customize Neural Network"))
+        self.ClearButton.setText(_translate("MainWindow", "Clear Map"))
+        self.PredictButton.setText(_translate("MainWindow", "Predict Map"))
+        self.label_9.setText(_translate("MainWindow", "Learning rate"))
+        self.EvolutionButton.setText(_translate("MainWindow", "Evolutionary Algorithm"))
+        self.label_2.setText(_translate("MainWindow", "Current ML backpropagation iteration:"))
+        self.BackButton.setText(_translate("MainWindow", "Backpropagation"))
+        self.AutoButton.setText(_translate("MainWindow", "Update Map on every point placement"))
+        self.ResetButton.setText(_translate("MainWindow", "Reset ANN"))
+        self.label.setText(_translate("MainWindow", "Choose classification system:"))
+        self.CounterLabel.setText(_translate("MainWindow", "0"))
@@ -1,13 +1,14 @@
-from PyQt5 import uic
 from PyQt5.QtCore import QPoint
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import QMainWindow
+from application.image_ui import Ui_MainWindow
 
 
-class Window(QMainWindow):
+class Window(QMainWindow, Ui_MainWindow):
     def __init__(self, parent_app):
         super(Window, self).__init__()
-        uic.loadUi("application/resource/Image.ui", self)
+        # generated from application/resource/Image.ui with pyuic5, regenerate it after editing the .ui file
+        self.setupUi(self)
         self.setFixedSize(1000, 700)
         self.setWindowTitle("Neural Network Tester")
         self.setWindowIcon(QIcon("resource/icon.ico"))
@@ -19,16 +20,16 @@ class Window(QMainWindow):
         point = QPoint(event.x() - 300, event.y())
         if 300 <= event.x() <= 1000 and 0 <= event.y() <= 700:
             if event.button() == 1:
-                self.parent.netmanager.redpoints.append(point)
+                self.parent.netmanager.add_point(point, 0)
                 self.parent.painter.paint_red(point)
             elif event.button() == 4:
-                print(self.parent.netmanager.network.calculate([(point.x() - 350) / 700, (point.y() - 350) / 700]))
+                print(self.parent.netmanager.predict(point))
                 print(point.x(), point.y())
             else:
-                self.parent.netmanager.greenpoints.append(point)
+                self.parent.netmanager.add_point(point, 1)
                 self.parent.painter.paint_green(point)
         if self.parent.window.AutoButton.isChecked():
-            self.parent.train_network()
+            self.parent.train_network(incremental=True)
 
     def connect_elements(self):
         self.ClearButton.clicked.connect(self.parent.clear_map)
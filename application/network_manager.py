@@ -1,94 +1,200 @@
-from PyQt5.QtCore import *
-from ann.neural import Network, to_batches
+import os
+from threading import Event
+import numpy as np
+import ann.functions as f
+from ann.checkpoint import load_network, load_population, save_network, save_population
+from ann.data import Dataset
+from ann.neural import Network
 from ann.ens import EvolutionaryNetworkSystem
+from ann.optimizers import get_optimizer
+from ann.profiling import Profiler
+from ann.training import TrainingController, incremental_update
 import random as rand
 
+CHECKPOINT_DIRECTORY = "checkpoints"
+NETWORK_CHECKPOINT = os.path.join(CHECKPOINT_DIRECTORY, "network.ckpt")
+POPULATION_CHECKPOINT = os.path.join(CHECKPOINT_DIRECTORY, "population.ckpt")
+PROFILING = os.environ.get("NNPROJECT_PROFILE") == "1"
+INCREMENTAL_STEPS = 25
+INCREMENTAL_MAX_DROP = 0.1
 
-class NetworkManager:
-
-    class MLWorker(QObject):
-        finished = pyqtSignal()
-        progress = pyqtSignal(int)
-
-        def run(self, parent):
-            points = [([(point.x() - 350) / 700, (point.y() - 350) / 700], 0) for point in parent.redpoints]
-            points += [([(point.x() - 350) / 700, (point.y() - 350) / 700], 1) for point in parent.greenpoints]
-            best_network = parent.network
-            best_count = 0
-            if len(points) > 0:
-                for i in range(5000):
-                    self.progress.emit(i + 1)
-                    correct_count = 0
-                    rand.shuffle(points)
-                    batches = to_batches(points, 4)
-                    for pair in points:
-                        r = parent.network.calculate(pair[0])
-                        if pair[1] == 0:
-                            if r < 0.5:
-                                correct_count += 1
-                        else:
-                            if r >= 0.5:
-                                correct_count += 1
-                    if correct_count == len(points):
-                        break
-                    if correct_count > best_count:
-                        best_count = correct_count
-                        best_network = parent.network
-                    for batch in batches:
-                        parent.network.backpropagation(batch)
-            parent.network = best_network
-            self.finished.emit()
 
-    class ENSWorker(QObject):...
+class NetworkManager:
 
     def __init__(self, parent_app):
         self.redpoints = []
         self.greenpoints = []
+        self.recent_points = []
         self.parent = parent_app
-        self.network = Network([2, 8, 8, 4, 1], 0.045, ['lin', 'sig', 'lin', 'sig'])
-        self.ens = EvolutionaryNetworkSystem(20, 0.6, 0.5, [2, 8, 8, 5, 1], 0.045, ['lin', 'sig', 'lin', 'sig'])
+        self.dtype = np.float32
+        self.optimizer_name = "SGD"
+        self.schedule_name = "Constant"
+        self.network = self.create_network([2, 8, 8, 4, 1], ['lin', 'sig', 'lin', 'sig'])
+        self._ens = None
+        self.frozen = None
+        self.frozen_source = None
+        self.accuracy_record = None
+        self.load_checkpoints()
         self.progress_label = parent_app.window.CounterLabel
-        self.thread = None
-        self.worker = None
-        self.thread_active = False
+        self.stats_label = parent_app.window.StatsLabel
+        self.profiler = Profiler(callback=self.show_stats) if PROFILING else None
+
+    def create_network(self, layers, functions):
+        return Network(layers, 0.045, functions, f.MSE, self.dtype, get_optimizer(self.optimizer_name, self.schedule_name))
+
+    def load_checkpoints(self):
+        try:
+            if os.path.exists(NETWORK_CHECKPOINT):
+                self.network = load_network(NETWORK_CHECKPOINT)
+                self.optimizer_name = self.network.optimizer.name
+                self.schedule_name = self.network.optimizer.schedule.name
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Ignoring unreadable checkpoint: {error}")
+
+    @property
+    def ens(self):
+        # the population is only needed for evolution, so it is loaded or created on first use
+        if self._ens is None:
+            try:
+                if os.path.exists(POPULATION_CHECKPOINT):
+                    self._ens = load_population(POPULATION_CHECKPOINT)
+            except (OSError, ValueError, KeyError) as error:
+                print(f"Ignoring unreadable checkpoint: {error}")
+            if self._ens is None:
+                self._ens = EvolutionaryNetworkSystem(20, 0.6, 0.5, [2, 8, 8, 5, 1], 0.045,
+                                                      ['lin', 'sig', 'lin', 'sig'], f.MSE, self.dtype)
+        return self._ens
+
+    def save_checkpoints(self):
+        os.makedirs(CHECKPOINT_DIRECTORY, exist_ok=True)
+        save_network(NETWORK_CHECKPOINT, self.network)
+        if self._ens is not None:
+            save_population(POPULATION_CHECKPOINT, self._ens)
 
     def update_learning_rate(self, lr):
         self.network.learning_rate = lr
-        print(self.thread)
 
     def reset_network(self):
-        self.network = Network([2, 8, 8, 4, 1], 0.045, ['lin', 'sig', 'lin', 'sig'])
-        self.ens = EvolutionaryNetworkSystem(20, 0.6, 0.5, [2, 8, 8, 5, 1], 0.045, ['ReLU', 'sig', 'ReLU', 'sig'])
+        self.network = self.create_network([2, 8, 8, 4, 1], ['lin', 'sig', 'lin', 'sig'])
+        self._ens = EvolutionaryNetworkSystem(20, 0.6, 0.5, [2, 8, 8, 5, 1], 0.045, ['ReLU', 'sig', 'ReLU', 'sig'],
+                                              f.MSE, self.dtype)
+        # otherwise the next start would load the network from before the reset
+        self.save_checkpoints()
+
+    def add_point(self, point, label):
+        (self.greenpoints if label else self.redpoints).append(point)
+        self.recent_points.append((point, label))
+
+    @staticmethod
+    def to_entry(point, label):
+        return [(point.x() - 350) / 700, (point.y() - 350) / 700], label
+
+    def labeled_points(self):
+        return ([self.to_entry(point, 0) for point in self.redpoints] +
+                [self.to_entry(point, 1) for point in self.greenpoints])
+
+    def predict(self, point):
+        network = self.network
+        if self.frozen_source is not network or self.frozen.version != network.version:
+            self.frozen = network.freeze()
+            self.frozen_source = network
+        return self.frozen.calculate(self.to_entry(point, 0)[0])
 
     def clear_points(self):
         self.redpoints.clear()
         self.greenpoints.clear()
+        self.recent_points.clear()
+
+    def machine_learning(self, cancelled=None, progress=None):
+        cancelled = cancelled if cancelled is not None else Event()
+        points = self.labeled_points()
+        self.recent_points.clear()
+        network = self.network
+        if self.profiler is not None:
+            self.profiler.reset()
+            network.profiler = self.profiler
+        if len(points) > 0:
+            dataset = Dataset.from_entries(points, network.dtype)
+            controller = TrainingController(network)
+            for i in range(5000):
+                if progress is not None:
+                    progress(i + 1)
+                if controller.update(dataset.features, dataset.labels) or cancelled.is_set():
+                    break
+                for inputs, labels in dataset.batches(4):
+                    if cancelled.is_set():
+                        break
+                    network.backpropagation_batch(inputs, labels)
+            controller.restore_best()
+            if progress is not None:
+                progress(controller.epoch, force=True)
+            if not cancelled.is_set():
+                self.accuracy_record = (network, controller.best_accuracy)
+        if not cancelled.is_set():
+            self.save_checkpoints()
 
-    def machine_learning(self):
-        if not self.thread_active:
-            self.thread_active = True
-            self.thread = QThread()
-            self.worker = self.MLWorker()
-            self.worker.moveToThread(self.thread)
-            self.thread.started.connect(lambda: self.worker.run(self))
-            self.worker.finished.connect(self.terminate_thread)
-            self.thread.finished.connect(self.thread.deleteLater)
-            self.worker.progress.connect(self.progressReport)
-            self.thread.start()
-
-    def terminate_thread(self):
-        self.worker.deleteLater()
-        self.parent.updateScreen()
-        self.thread.quit()
-        self.thread_active = False
+    def report_stats(self):
+        if self.profiler is not None:
+            self.profiler.report()
 
     def progressReport(self, e):
         self.progress_label.setText(str(e))
 
-    def evolve_network(self):
-        points = [([(point.x() - 350) / 700, (point.y() - 350) / 700], 0) for point in self.redpoints]
-        points += [([(point.x() - 350) / 700, (point.y() - 350) / 700], 1) for point in self.greenpoints]
+    def show_stats(self, profiler):
+        self.stats_label.setText(profiler.format())
+
+    def incremental_learning(self, cancelled=None, progress=None):
+        cancelled = cancelled if cancelled is not None else Event()
+        points = self.labeled_points()
+        recent = [self.to_entry(point, label) for point, label in self.recent_points]
+        self.recent_points.clear()
+        if len(points) == 0:
+            return
+        if len(recent) == 0:
+            self.machine_learning(cancelled, progress)
+            return
+        network = self.network
+        dataset = Dataset.from_entries(points, network.dtype)
+        focus = Dataset.from_entries(recent, network.dtype)
+        accuracy = incremental_update(network, dataset, focus.features, focus.labels, INCREMENTAL_STEPS)
+        if cancelled.is_set():
+            return
+        # only a collapse relative to what a full run of this network reached justifies a full retrain, point sets
+        # that no network separates well would otherwise retrain on every click. Incremental runs may raise the
+        # reference but never lower it, so a collapse spread over several clicks is still caught
+        if self.accuracy_record is None or self.accuracy_record[0] is not network:
+            self.accuracy_record = (network, accuracy)
+        reference = self.accuracy_record[1]
+        if accuracy < reference * (1 - INCREMENTAL_MAX_DROP):
+            self.machine_learning(cancelled, progress)
+            return
+        self.accuracy_record = (network, max(reference, accuracy))
+        self.save_checkpoints()
+
+    def evolve_network(self, cancelled=None, progress=None):
+        cancelled = cancelled if cancelled is not None else Event()
+        points = self.labeled_points()
+        self.recent_points.clear()
         if len(points) > 0:
             rand.shuffle(points)
-            self.ens.evolve(points, 20)
-        self.network = self.ens.getbestnetwork(points)
+            # a reset during the run replaces the population, the result of this one must not be installed then
+            ens = self.ens
+            if self.profiler is not None:
+                self.profiler.reset()
+                ens.set_profiler(self.profiler)
+
+            generations = [0]
+
+            def report(generation, system):
+                generations[0] = generation
+                if progress is not None:
+                    progress(generation)
+                return not cancelled.is_set()
+
+            ens.evolve(points, 20, callback=report)
+            if progress is not None:
+                progress(generations[0], force=True)
+            if cancelled.is_set():
+                return
+            self.network = ens.get_best_network(points)
+            self.save_checkpoints()
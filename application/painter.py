@@ -1,13 +1,26 @@
+import numpy as np
 from PyQt5.QtCore import *
-from PyQt5.QtGui import QPainter, QPen, QColor
+from PyQt5.QtGui import QPainter, QImage
+
+POSITIVE_COLOR = (100, 255, 100)
+NEGATIVE_COLOR = (255, 100, 100)
+COARSE_CELL = 8
+THRESHOLD_MARGIN = 0.05
 
 
 class Painter:
     def __init__(self, image, scene):
         self.image = image
         self.scene = scene
+        self.buffer = None
+        self.boundary = None
         self.reset_image()
         self.resolution = 4
+        self.adaptive = True
+        self.evaluations = 0
+        self.render_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def reset_image(self):
         self.scene.fill(Qt.white)
@@ -42,13 +55,86 @@ class Painter:
         self.image.setPixmap(self.scene)
 
     def paint_scene(self, network):
-        self.scene.fill(QColor(100, 255, 100))
+        # the boundary image only depends on the network's parameters and the render settings, training, mutation
+        # and crossover bump network.version and the settings window swaps in a new network object
+        key = (network, network.version, self.resolution, self.adaptive)
+        if key != self.render_key:
+            self.render_boundary(network)
+            self.render_key = key
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+
+        height, width = self.buffer.shape[:2]
+        offset = -50 - self.resolution / 2
         qp = QPainter()
         qp.begin(self.scene)
-        qp.setPen(QPen(QColor(255, 100, 100), self.resolution, Qt.SolidLine))
-        for x in range(-50, 710, self.resolution):
-            for y in range(-50, 710, self.resolution):
-                r = network.calculate([(x - 350) / 700, (y - 350) / 700])
-                if r < 0.5:
-                    qp.drawPoint(QPoint(x, y))
+        qp.drawImage(QRectF(offset, offset, width * self.resolution, height * self.resolution), self.boundary)
         qp.end()
+
+    def render_boundary(self, network):
+        coordinates = ((np.arange(-50, 710, self.resolution) - 350) / 700).astype(network.dtype)
+        if self.adaptive:
+            negative = self.classify_adaptive(network, coordinates)
+        else:
+            negative = self.classify_uniform(network, coordinates)
+
+        height, width = negative.shape
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self.buffer[...] = POSITIVE_COLOR
+        self.buffer[negative] = NEGATIVE_COLOR
+        self.boundary = QImage(self.buffer.data, width, height, 3 * width, QImage.Format_RGB888)
+
+    def invalidate(self):
+        self.render_key = None
+
+    def classify_uniform(self, network, coordinates):
+        xs, ys = np.meshgrid(coordinates, coordinates)
+        grid = np.column_stack((xs.ravel(), ys.ravel()))
+        self.evaluations = len(grid)
+        return network.calculate_batch(grid)[:, 0].reshape(xs.shape) < 0.5
+
+    def classify_adaptive(self, network, coordinates):
+        # quadtree over the sample grid: a cell whose corners agree on the class and are not close to the threshold
+        # is filled with that class, every other cell is split in four, and each level is evaluated in one batch
+        size = len(coordinates)
+        values = np.full((size, size), np.nan, dtype=network.dtype)
+        negative = np.zeros((size, size), dtype=bool)
+        self.evaluations = 0
+        step = COARSE_CELL
+        starts = np.arange(0, size - 1, step)
+        rows, cols = (grid.ravel() for grid in np.meshgrid(starts, starts, indexing="ij"))
+        while len(rows) > 0:
+            row_ends = np.minimum(rows + step, size - 1)
+            col_ends = np.minimum(cols + step, size - 1)
+            corner_rows = np.concatenate((rows, rows, row_ends, row_ends))
+            corner_cols = np.concatenate((cols, col_ends, cols, col_ends))
+            missing = np.isnan(values[corner_rows, corner_cols])
+            if np.any(missing):
+                flat = np.unique(corner_rows[missing] * size + corner_cols[missing])
+                missing_rows, missing_cols = np.divmod(flat, size)
+                points = np.column_stack((coordinates[missing_cols], coordinates[missing_rows]))
+                values[missing_rows, missing_cols] = network.calculate_batch(points)[:, 0]
+                self.evaluations += len(flat)
+            corners = values[corner_rows, corner_cols].reshape(4, -1)
+            if step == 1:
+                break
+            below = corners < 0.5
+            split = (np.any(below, axis=0) != np.all(below, axis=0)) | \
+                    np.any(np.abs(corners - 0.5) < THRESHOLD_MARGIN, axis=0)
+            # cells of one level are aligned to the step, so the settled ones are painted through a block map
+            blocks = np.full((-(-(size - 1) // step),) * 2, -1, dtype=np.int8)
+            blocks[rows[~split] // step, cols[~split] // step] = below[0, ~split]
+            block_index = np.minimum(np.arange(size) // step, len(blocks) - 1)
+            filled = blocks[np.ix_(block_index, block_index)]
+            negative[filled >= 0] = filled[filled >= 0] == 1
+            half = step // 2
+            rows, cols, row_ends, col_ends = rows[split], cols[split], row_ends[split], col_ends[split]
+            rows, cols = (np.concatenate((rows, rows + half, rows, rows + half)),
+                          np.concatenate((cols, cols, cols + half, cols + half)))
+            keep = (rows < np.tile(row_ends, 4)) & (cols < np.tile(col_ends, 4))
+            rows, cols, step = rows[keep], cols[keep], half
+        # every sample that was evaluated keeps its own class, which covers the cells refined down to single samples
+        evaluated = ~np.isnan(values)
+        negative[evaluated] = values[evaluated] < 0.5
+        return negative
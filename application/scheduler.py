@@ -0,0 +1,75 @@
+import logging
+import time
+from threading import Event, Lock, Thread
+from PyQt5.QtCore import QObject, pyqtSignal
+
+PROGRESS_INTERVAL = 0.05
+INCREMENTAL = "incremental"
+BACKPROPAGATION = "backpropagation"
+EVOLUTION = "evolution"
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingScheduler(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal()
+
+    def __init__(self, job):
+        super(TrainingScheduler, self).__init__()
+        self.job = job
+        self.lock = Lock()
+        self.cancelled = Event()
+        self.pending = None
+        self.current = None
+        self.running = False
+        self.last_progress = 0.0
+
+    def merge_pending(self, kind):
+        # requests that arrive during a run collapse into one follow-up run, a full run wins over an incremental one
+        if self.pending is None or self.pending == INCREMENTAL or kind != INCREMENTAL:
+            self.pending = kind
+
+    def request(self, kind):
+        with self.lock:
+            if self.running:
+                # the run in flight is stale now, the follow-up run has to cover what it would have done
+                self.merge_pending(self.current)
+                self.merge_pending(kind)
+                self.cancelled.set()
+                return
+            self.merge_pending(kind)
+            self.running = True
+        Thread(target=self.run, daemon=True).start()
+
+    def cancel(self):
+        with self.lock:
+            self.pending = None
+            self.cancelled.set()
+
+    def run(self):
+        try:
+            while True:
+                with self.lock:
+                    if self.pending is None:
+                        self.running = False
+                        return
+                    self.current = self.pending
+                    self.pending = None
+                    self.cancelled.clear()
+                # a failing run (e.g. a checkpoint that cannot be written) must not stop the queue from draining
+                try:
+                    self.job(self.current, self.cancelled, self.report_progress)
+                except Exception:
+                    logger.exception("%s training run failed", self.current)
+                self.finished.emit()
+        except BaseException:
+            with self.lock:
+                self.running = False
+            raise
+
+    def report_progress(self, value, force=False):
+        now = time.perf_counter()
+        if force or now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.progress.emit(value)
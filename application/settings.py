@@ -1,8 +1,16 @@
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import QWidget, QLabel, QSpinBox, QComboBox, QPushButton
-from ann.neural import Network
+import ann.functions as f
+from ann.optimizers import OPTIMIZERS, SCHEDULES
 from application.settings_painter import SettingsPainter
 
+FUNCTION_NAMES = {
+    "Sigmoid": "sig",
+    "Linear": "lin",
+    "ReLU": "ReLU",
+    "Protected Tanh": "tanh"
+}
+
 
 class MenuTitle:
     def __init__(self, parent_window, x, y):
@@ -139,6 +147,18 @@ class SettingsWindow(QWidget):
         self.setWindowTitle("Settings")
         self.image = QLabel(self)
         self.menu = NeuralMenu(self)
+        self.OptimizerLabel = QLabel("Optimizer: ", self)
+        self.OptimizerBox = QComboBox(self)
+        self.OptimizerBox.addItems(list(OPTIMIZERS))
+        self.ScheduleLabel = QLabel("LR schedule: ", self)
+        self.ScheduleBox = QComboBox(self)
+        self.ScheduleBox.addItems(list(SCHEDULES))
+        self.OptimizerLabel.move(520, 642)
+        self.OptimizerBox.move(630, 640)
+        self.OptimizerBox.resize(90, 20)
+        self.ScheduleLabel.move(520, 667)
+        self.ScheduleBox.move(630, 665)
+        self.ScheduleBox.resize(90, 20)
         self.OKButton = QPushButton("Ok", self)
         self.CancelButton = QPushButton("Cancel", self)
         self.CancelButton.clicked.connect(self.close)
@@ -153,27 +173,26 @@ class SettingsWindow(QWidget):
         self.menu.reset_layers()
         network = self.parent.netmanager.network
         hiddenlayers = []
-        functions = network.functions
+        labels = {f.get_activation(name): label for label, name in FUNCTION_NAMES.items()}
+        functions = [labels.get(function, "Linear") for function in network.functions]
         for layer in network.weights[:-1]:
             hiddenlayers.append(len(layer))
         for hiddenlayer, function in zip(hiddenlayers, functions):
             self.menu.add_layer(False, hiddenlayer, function)
+        self.OptimizerBox.setCurrentText(self.parent.netmanager.optimizer_name)
+        self.ScheduleBox.setCurrentText(self.parent.netmanager.schedule_name)
         self.update_image()
 
     def update_network(self):
-        convert = {
-            "Sigmoid": "sig",
-            "Linear": "lin",
-            "ReLU": "ReLU",
-            "Protected Tanh": "tanh"
-        }
         newfunctions = []
         newlayers = []
         for layer in self.menu.menus:
             if len(newlayers):
-                newfunctions.append(convert[layer.combo_box.currentText()])
+                newfunctions.append(FUNCTION_NAMES[layer.combo_box.currentText()])
             newlayers.append(layer.spin_box.value())
-        self.parent.netmanager.network = Network(newlayers, 0.045, newfunctions)
+        self.parent.netmanager.optimizer_name = self.OptimizerBox.currentText()
+        self.parent.netmanager.schedule_name = self.ScheduleBox.currentText()
+        self.parent.netmanager.network = self.parent.netmanager.create_network(newlayers, newfunctions)
         self.close()
 
     def update_image(self):
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import platform
+import random as rand
+import subprocess
+import sys
+import time
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ann.functions as f
+from ann.data import Dataset
+from ann.ens import EvolutionaryNetworkSystem
+from ann.neural import Network
+
+LAYER_SIZES = [(2, 8, 8, 1), (2, 32, 32, 1), (2, 128, 128, 1)]
+BATCH_SIZES = [1, 64, 1024]
+POPULATION_SIZES = [8, 20, 40]
+RESOLUTIONS = [8, 4, 2, 1]
+
+
+def measure(function, repeats, setup=None):
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "median_s": float(np.median(timings)), "repeats": repeats}
+
+
+def make_points(count, seed=0):
+    rng = np.random.RandomState(seed)
+    inputs = rng.uniform(-0.5, 0.5, (count, 2))
+    labels = (np.hypot(inputs[:, 0], inputs[:, 1]) < 0.3).astype(float)
+    return inputs, labels
+
+
+def make_network(layers, seed=0):
+    np.random.seed(seed)
+    functions = [f.TANH] * (len(layers) - 2) + [f.SIGMOID]
+    return Network(layers, 0.045, functions, f.MSE)
+
+
+def bench_forward(repeats):
+    for layers in LAYER_SIZES:
+        network = make_network(layers)
+        for batch_size in BATCH_SIZES:
+            inputs, _ = make_points(batch_size)
+            params = {"layers": list(layers), "batch_size": batch_size}
+            yield "calculate", params, measure(lambda: [network.calculate(row) for row in inputs], repeats)
+            yield "calculate_all_batch", params, measure(lambda: network.calculate_all_batch(inputs), repeats)
+            frozen = network.freeze()
+            yield "frozen_calculate", params, measure(lambda: [frozen.calculate(row) for row in inputs], repeats)
+            yield "frozen_calculate_batch", params, measure(lambda: frozen.calculate_batch(inputs), repeats)
+
+
+def bench_backpropagation(repeats):
+    inputs, labels = make_points(256)
+    dataset = Dataset(inputs, labels)
+    for layers in LAYER_SIZES:
+        network = make_network(layers)
+        for batch_size in (4, 32):
+            def epoch():
+                for batch_inputs, batch_labels in dataset.batches(batch_size, shuffle=False):
+                    network.backpropagation_batch(batch_inputs, batch_labels)
+
+            params = {"layers": list(layers), "batch_size": batch_size, "points": len(dataset)}
+            yield "backpropagation_epoch", params, measure(epoch, repeats)
+
+
+def bench_evolution(repeats):
+    inputs, labels = make_points(100)
+    data = list(zip(inputs, labels))
+    state = {}
+    for pop_size in POPULATION_SIZES:
+        def reset():
+            rand.seed(0)
+            np.random.seed(0)
+            state["system"] = EvolutionaryNetworkSystem(pop_size, 0.6, 0.5, [2, 8, 8, 5, 1], 0.045,
+                                                        ["ReLU", "sig", "ReLU", "sig"])
+
+        params = {"pop_size": pop_size, "points": len(data)}
+        yield "evolve_generation", params, measure(lambda: state["system"].evolve(data, 1), repeats, setup=reset)
+
+
+def bench_painter(repeats):
+    from PyQt5.QtGui import QPixmap
+    from PyQt5.QtWidgets import QApplication, QLabel
+    from application.painter import Painter
+
+    app = QApplication.instance() or QApplication(sys.argv)  # must stay alive while the painter is used
+    painter = Painter(QLabel(), QPixmap(700, 700))
+    for layers in (LAYER_SIZES[0], LAYER_SIZES[1]):
+        network = make_network(layers)
+        for resolution in RESOLUTIONS:
+            for adaptive in (False, True):
+                painter.resolution = resolution
+                painter.adaptive = adaptive
+                params = {"layers": list(layers), "resolution": resolution, "adaptive": adaptive}
+                yield "paint_scene", params, measure(lambda: painter.paint_scene(network), repeats,
+                                                     setup=painter.invalidate)
+
+
+def bench_startup(repeats):
+    # a fresh interpreter per run, so this is the cold start an operator sees up to the first shown window
+    command = [sys.executable, os.path.join(ROOT, "main.py"), "--measure-startup"]
+    yield "startup", {}, measure(lambda: subprocess.run(command, cwd=ROOT, check=True, capture_output=True), repeats)
+
+
+BENCHMARKS = {
+    "forward": bench_forward,
+    "backpropagation": bench_backpropagation,
+    "evolution": bench_evolution,
+    "painter": bench_painter,
+    "startup": bench_startup
+}
+
+
+def result_key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result["median_s"] / old["median_s"]
+        result["baseline_median_s"] = old["median_s"]
+        result["ratio"] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the training, evolution and rendering hot paths.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative slowdown against the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for group in args.only:
+        for name, params, timing in BENCHMARKS[group](args.repeats):
+            results.append({"group": group, "name": name, "params": params, **timing})
+            print(f"{name:24} {json.dumps(params):60} {timing['median_s'] * 1000:10.3f} ms", file=sys.stderr)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        report["regressions"] = [result_key(result) for result in regressions]
+        for result in regressions:
+            print(f"REGRESSION {result['name']} {json.dumps(result['params'])}: {result['ratio']:.2f}x", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,15 @@
+import sys
+import time
+
+start = time.perf_counter()
+
 from application.app import App
 
 if __name__ == "__main__":
     application = App()
+    if "--measure-startup" in sys.argv:
+        application.window.show()
+        application.app.processEvents()
+        print(f"startup {(time.perf_counter() - start) * 1000:.1f} ms")
+        sys.exit(0)
     application.run()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import ann.functions as f
+
+INPUTS = np.linspace(-6.0, 6.0, 24).reshape(4, 6)
+
+
+@pytest.mark.parametrize("name", sorted(f.ACTIVATIONS))
+@pytest.mark.parametrize("aliased", [False, True])
+def test_out_matches_allocating_result(name, aliased):
+    function = f.ACTIVATIONS[name]
+    expected = function(INPUTS)
+    tensor = INPUTS.copy()
+    result = function(tensor, out=tensor if aliased else np.empty_like(tensor))
+    np.testing.assert_allclose(result, expected)
+
+    if function.derivative is not None:
+        expected = function(INPUTS, gradient=True)
+        tensor = INPUTS.copy()
+        result = function(tensor, gradient=True, out=tensor if aliased else np.empty_like(tensor))
+        np.testing.assert_allclose(result, expected)
+
+    if function.output_derivative is not None:
+        output = function(INPUTS)
+        expected = function.get_gradient_from_output(INPUTS, output)
+        result = function.get_gradient_from_output(INPUTS, output, out=output if aliased else np.empty_like(output))
+        np.testing.assert_allclose(result, expected)
+        np.testing.assert_allclose(expected, function(INPUTS, gradient=True), rtol=1e-6, atol=1e-12)
+
+
+def test_sigmoid_derivative_value():
+    buffer = np.empty(1)
+    np.testing.assert_allclose(f.SIGMOID(np.array([3.0]), gradient=True, out=buffer), [0.04517666], rtol=1e-6)